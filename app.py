@@ -2,6 +2,7 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 import pandas as pd
+import time
 from datetime import datetime
 
 st.set_page_config(
@@ -33,38 +34,107 @@ except Exception as e:
     client = None
 
 # Import other modules after environment setup
-from auth import login, signup
-from chatbot import initialize_chatbot, get_chatbot_response
+from auth import USER_DATA_FILE, get_user_profile, login, signup
+from chatbot import initialize_chatbot, get_chatbot_response, get_user_recommendations
+from response_cache import get_cache_stats
+from rate_limit import get_scheduler_stats
+from llm_usage import get_usage_stats
 from docs import show_documentation
-from utils import initialize_user_data_file
+from utils import format_chat_transcript, format_recipe_display, initialize_user_data_file
+from memo import fragment, get_rerun_stats, memoize, start_rerun
+from recipes import (
+    RECIPES_PER_PAGE, catalog_version, get_recipe_page,
+    get_recipes_by_ids, get_top_rated, recipe_matches
+)
+from popularity import get_trending, record_event, start_popularity_flusher
+from prefetch import get_prefetch_stats, is_prefetching, start_prefetch, use_prefetched
+from enrichment import enrich_recommendation, start_enrichment_worker, with_enrichment, get_enrichment_metrics
+from precompute import get_precomputed_recommendations, normalize_profile, start_precompute_job, store_live_recommendations
+from meal_planner import get_candidate_pool, plan_quality, plan_week
+from user_store import (
+    add_favorite, add_meals, add_shopping_items, append_chat_messages, load_chat_messages,
+    load_user_state, remove_favorite, remove_shopping_item
+)
 
 # Initialize user data file
 initialize_user_data_file()
 
+# Start the background recipe enrichment worker
+start_enrichment_worker()
+
+# Start flushing popularity events to the shared store
+start_popularity_flusher()
+
+# Refresh precomputed recommendations when profiles or the catalog change
+start_precompute_job(os.path.getmtime(USER_DATA_FILE), catalog_version())
+
 # Initialize session state variables
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
 if 'username' not in st.session_state:
     st.session_state.username = None
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = []  # recent messages, rendered as chat bubbles
+if 'chat_older_pages' not in st.session_state:
+    st.session_state.chat_older_pages = []  # log ids the older pages viewed end before; the last is shown
+if 'chat_has_older' not in st.session_state:
+    st.session_state.chat_has_older = False
 if 'current_tab' not in st.session_state:
     st.session_state.current_tab = "Login"
 if 'chatbot' not in st.session_state:
     st.session_state.chatbot = initialize_chatbot()
 if 'favorite_recipes' not in st.session_state:
-    st.session_state.favorite_recipes = set()
+    st.session_state.favorite_recipes = {}  # recipe id -> time added
 if 'shopping_list' not in st.session_state:
     st.session_state.shopping_list = []
 if 'meal_plan' not in st.session_state:
     st.session_state.meal_plan = pd.DataFrame(columns=['date', 'meal'])
 if 'category' not in st.session_state:
     st.session_state.category = None
+if 'prefetch' not in st.session_state:
+    st.session_state.prefetch = {}
+if 'home_page' not in st.session_state:
+    st.session_state.home_page = 0
+if 'home_filters' not in st.session_state:
+    st.session_state.home_filters = None
+
+# Number of recipes shown in the Featured section
+FEATURED_COUNT = 4
+
+# Chat messages loaded at a time; at most twice this many are kept as bubbles
+CHAT_PAGE_SIZE = 20
 
 def switch_tab(tab_name):
     st.session_state.current_tab = tab_name
 
+def current_profile():
+    """The logged-in user's profile, from the post-login prefetch on first use"""
+    username = st.session_state.username
+    return use_prefetched(st.session_state.prefetch, "profile", lambda: get_user_profile(username))
+
+def reset_chat(username):
+    """Start a fresh conversation showing the user's most recent logged messages"""
+    st.session_state.chatbot = initialize_chatbot()
+    st.session_state.chat_older_pages = []
+    if username is None:
+        messages, has_older = [], False
+    else:
+        messages, has_older = load_chat_messages(username, CHAT_PAGE_SIZE)
+    st.session_state.chat_history = messages
+    st.session_state.chat_has_older = has_older
+
+def on_login(username):
+    # Warm profile, search results and recommendations before the first page view
+    st.session_state.prefetch = start_prefetch(username)
+    # Restore what the user collected in earlier sessions
+    favorites, meals, items = load_user_state(username)
+    st.session_state.favorite_recipes = favorites
+    st.session_state.meal_plan = pd.DataFrame(meals, columns=['date', 'meal'])
+    st.session_state.shopping_list = items
+    reset_chat(username)
+
 def main():
+    start_rerun()
     st.title("🍳 Recipe Collection")
     
     # Sidebar for navigation
@@ -86,13 +156,18 @@ def main():
             if st.button("Logout", key="logout_button"):
                 st.session_state.logged_in = False
                 st.session_state.username = None
+                st.session_state.prefetch = {}
+                st.session_state.favorite_recipes = {}
+                st.session_state.shopping_list = []
+                st.session_state.meal_plan = pd.DataFrame(columns=['date', 'meal'])
+                reset_chat(None)
                 st.session_state.current_tab = "Login"
                 st.rerun()
     
     # Main content area
     if not st.session_state.logged_in:
         if st.session_state.current_tab == "Login":
-            login()
+            login(on_success=on_login)
         else:
             signup()
     else:
@@ -145,157 +220,39 @@ def show_home():
     with category_cols[3]:
         if st.button("🥪 Quick Meals"):
             st.session_state.category = "quick-meals"
+    if st.session_state.category:
+        if st.button(f"✖️ Clear category: {st.session_state.category}", key="clear_category"):
+            st.session_state.category = None
+            st.rerun()
             
     st.divider()
     
-    # Featured Recipes
-    st.subheader("⭐ Featured Recipes")
-    st.write("Here are some of the most popular recipes from around the world:")
+    show_recommendations()
     
-    # Famous recipes data
-    famous_recipes = [
-        {
-            "name": "Classic Margherita Pizza",
-            "cuisine": "Italian",
-            "category": "vegetarian",
-            "rating": 4.8,
-            "difficulty": "Medium",
-            "ingredients": """
-            - 2 1/4 cups all-purpose flour
-            - 1 tsp active dry yeast
-            - 1 cup warm water
-            - 1 tsp salt
-            - 1 tbsp olive oil
-            - 1 cup tomato sauce
-            - 8 oz fresh mozzarella
-            - Fresh basil leaves
-            - Extra virgin olive oil
-            """,
-            "instructions": """
-            1. Mix flour, yeast, and salt in a bowl
-            2. Add warm water and olive oil, knead for 10 minutes
-            3. Let dough rise for 2 hours
-            4. Roll out dough and add toppings
-            5. Bake at 450°F for 15-20 minutes
-            """,
-            "cooking_time": "2 hours 30 minutes",
-            "nutrition": {
-                "calories": 250,
-                "protein": 10,
-                "carbs": 30,
-                "fat": 8
-            }
-        },
-        {
-            "name": "Butter Chicken",
-            "cuisine": "Indian",
-            "category": "non-vegetarian",
-            "rating": 4.9,
-            "difficulty": "Medium",
-            "ingredients": """
-            - 2 lbs chicken thighs
-            - 1 cup yogurt
-            - 2 tbsp ginger-garlic paste
-            - 2 tsp garam masala
-            - 1 tsp turmeric
-            - 2 cups tomato sauce
-            - 1 cup heavy cream
-            - 4 tbsp butter
-            - Fresh cilantro
-            """,
-            "instructions": """
-            1. Marinate chicken in yogurt and spices
-            2. Cook chicken until golden
-            3. Prepare sauce with tomatoes and cream
-            4. Combine chicken and sauce
-            5. Garnish with cilantro
-            """,
-            "cooking_time": "1 hour",
-            "nutrition": {
-                "calories": 450,
-                "protein": 35,
-                "carbs": 12,
-                "fat": 28
-            }
-        },
-        {
-            "name": "Sushi Roll",
-            "cuisine": "Japanese",
-            "category": "non-vegetarian",
-            "rating": 4.7,
-            "difficulty": "Hard",
-            "ingredients": """
-            - 2 cups sushi rice
-            - 4 sheets nori
-            - 1 avocado
-            - 1 cucumber
-            - 8 oz fresh tuna
-            - Soy sauce
-            - Wasabi
-            - Pickled ginger
-            """,
-            "instructions": """
-            1. Cook sushi rice with vinegar
-            2. Lay nori sheet on bamboo mat
-            3. Spread rice and add fillings
-            4. Roll tightly using the mat
-            5. Slice into pieces
-            """,
-            "cooking_time": "1 hour",
-            "nutrition": {
-                "calories": 320,
-                "protein": 18,
-                "carbs": 45,
-                "fat": 9
-            }
-        },
-        {
-            "name": "Chocolate Lava Cake",
-            "cuisine": "French",
-            "category": "desserts",
-            "rating": 4.9,
-            "difficulty": "Medium",
-            "ingredients": """
-            - 6 oz dark chocolate
-            - 6 oz butter
-            - 3 eggs
-            - 3 egg yolks
-            - 1/2 cup sugar
-            - 1/4 cup flour
-            - Vanilla extract
-            - Powdered sugar
-            """,
-            "instructions": """
-            1. Melt chocolate and butter
-            2. Mix eggs, sugar, and flour
-            3. Combine all ingredients
-            4. Pour into ramekins
-            5. Bake at 400°F for 12 minutes
-            """,
-            "cooking_time": "30 minutes",
-            "nutrition": {
-                "calories": 380,
-                "protein": 6,
-                "carbs": 35,
-                "fat": 24
-            }
-        }
-    ]
+    st.divider()
     
-    # Filter recipes based on user input
-    filtered_recipes = famous_recipes
-    if search_query:
-        filtered_recipes = [r for r in filtered_recipes if search_query.lower() in r['name'].lower()]
-    if cuisine_filter != "All":
-        filtered_recipes = [r for r in filtered_recipes if r['cuisine'] == cuisine_filter]
-    if time_filter != "All":
-        if time_filter == "Quick (< 30 mins)":
-            filtered_recipes = [r for r in filtered_recipes if "minutes" in r['cooking_time'] and int(r['cooking_time'].split()[0]) <= 30]
-        elif time_filter == "Medium (30-60 mins)":
-            filtered_recipes = [r for r in filtered_recipes if ("hour" in r['cooking_time'] and int(r['cooking_time'].split()[0]) == 1) or 
-                              ("minutes" in r['cooking_time'] and 30 < int(r['cooking_time'].split()[0]) <= 60)]
-        else:
-            filtered_recipes = [r for r in filtered_recipes if "hour" in r['cooking_time'] and int(r['cooking_time'].split()[0]) > 1]
+    show_featured()
+    
+    st.divider()
+    
+    # Browse the catalog
+    st.subheader("📖 Browse Recipes")
+    
+    # Only fetch the visible page of filtered recipes
+    category = st.session_state.category
+    filters = (search_query, cuisine_filter, time_filter, category)
+    if st.session_state.home_filters != filters:
+        st.session_state.home_filters = filters
+        st.session_state.home_page = 0
+    page = st.session_state.home_page
+    # Never hold the first view back for warm-up tasks; they only count hits and misses
+    version = use_prefetched(st.session_state.prefetch, "catalog", catalog_version, wait=0)
+    use_prefetched(st.session_state.prefetch, "search", lambda: None, wait=0)
+    filtered_recipes, total_recipes = get_recipe_page(
+        search_query, cuisine_filter, time_filter, category, page, version
+    )
+    total_pages = max(1, -(-total_recipes // RECIPES_PER_PAGE))
+    render_start = time.perf_counter()
     
     # Display recipes in a grid
     if not filtered_recipes:
@@ -304,76 +261,233 @@ def show_home():
         col1, col2 = st.columns(2)
         for i, recipe in enumerate(filtered_recipes):
             with col1 if i % 2 == 0 else col2:
-                with st.expander(f"{recipe['name']} ({recipe['cuisine']})", expanded=i==0):
-                    # Recipe header
-                    col_a, col_b, col_c = st.columns([2,2,1])
-                    with col_a:
-                        st.write(f"⭐ Rating: {recipe['rating']}/5.0")
-                    with col_b:
-                        st.write(f"🔨 Difficulty: {recipe['difficulty']}")
-                    with col_c:
-                        if recipe['name'] in st.session_state.favorite_recipes:
-                            if st.button("❤️", key=f"fav_{recipe['name']}"):
-                                st.session_state.favorite_recipes.remove(recipe['name'])
-                        else:
-                            if st.button("🤍", key=f"fav_{recipe['name']}"):
-                                st.session_state.favorite_recipes.add(recipe['name'])
-                    
-                    # Recipe content
-                    st.write("**Ingredients:**")
-                    st.write(recipe['ingredients'])
-                    st.write("**Instructions:**")
-                    st.write(recipe['instructions'])
-                    st.write(f"**Cooking Time:** {recipe['cooking_time']}")
-                    
-                    # Nutrition information
-                    st.write("**Nutrition Information:**")
-                    nutrition_cols = st.columns(4)
-                    with nutrition_cols[0]:
-                        st.metric("Calories", f"{recipe['nutrition']['calories']} kcal")
-                    with nutrition_cols[1]:
-                        st.metric("Protein", f"{recipe['nutrition']['protein']}g")
-                    with nutrition_cols[2]:
-                        st.metric("Carbs", f"{recipe['nutrition']['carbs']}g")
-                    with nutrition_cols[3]:
-                        st.metric("Fat", f"{recipe['nutrition']['fat']}g")
-                    
-                    # Action buttons
-                    col_x, col_y = st.columns(2)
-                    with col_x:
-                        if st.button("🛒 Add to Shopping List", key=f"shop_{recipe['name']}"):
-                            ingredients = [ing.strip() for ing in recipe['ingredients'].split('\n') if ing.strip() and ing.strip().startswith('-')]
-                            st.session_state.shopping_list.extend(ingredients)
-                            st.success("Added to shopping list!")
-                    with col_y:
-                        if st.button("📅 Add to Meal Planner", key=f"plan_{recipe['name']}"):
-                            new_meal = pd.DataFrame([{
-                                'date': datetime.today().strftime('%Y-%m-%d'),
-                                'meal': recipe['name']
-                            }])
-                            st.session_state.meal_plan = pd.concat([st.session_state.meal_plan, new_meal], ignore_index=True)
-                            st.success("Added to meal planner!")
+                show_recipe_card(with_enrichment(recipe), expanded=i == 0)
+        # Pagination controls
+        nav_prev, nav_info, nav_next = st.columns([1, 2, 1])
+        with nav_prev:
+            if st.button("⬅️ Previous", key="home_prev_page", disabled=page == 0):
+                st.session_state.home_page = page - 1
+                st.rerun()
+        with nav_info:
+            st.write(f"Page {page + 1} of {total_pages} ({total_recipes} recipes)")
+        with nav_next:
+            if st.button("Next ➡️", key="home_next_page", disabled=page + 1 >= total_pages):
+                st.session_state.home_page = page + 1
+                st.rerun()
+        
+        render_ms = (time.perf_counter() - render_start) * 1000
+        st.caption(f"Rendered page {page + 1} in {render_ms:.1f} ms")
+        
+        enrichment = get_enrichment_metrics()
+        st.caption(
+            f"Enrichment: {enrichment['coverage']:.0%} coverage, "
+            f"{enrichment['queue_depth']} queued, "
+            f"{enrichment['throughput_per_sec']:.1f} recipes/s"
+        )
+        
+        memo_stats = get_rerun_stats()
+        st.caption("Cache this rerun: " + ", ".join(
+            f"{name} {stats['hits']} hit / {stats['misses']} miss" for name, stats in memo_stats.items()
+        ))
+        prefetch_stats = get_prefetch_stats()
+        if prefetch_stats:
+            st.caption("Prefetch: " + ", ".join(
+                f"{name} {stats['hits']} hit / {stats['misses']} miss / {stats['pending']} pending"
+                for name, stats in prefetch_stats.items()
+            ))
+
+@fragment
+def show_recipe_card(recipe, expanded=False):
+    """Render one recipe card; as a fragment, its buttons only rerun this card"""
+    with st.expander(f"{recipe.name} ({recipe.cuisine})", expanded=expanded):
+        # Recipe header
+        col_a, col_b, col_c = st.columns([2,2,1])
+        with col_a:
+            st.write(f"⭐ Rating: {recipe.rating}/5.0")
+        with col_b:
+            st.write(f"🔨 Difficulty: {recipe.difficulty or 'Pending'}")
+        with col_c:
+            rid = recipe.id
+            if rid in st.session_state.favorite_recipes:
+                if st.button("❤️", key=f"fav_{rid}"):
+                    del st.session_state.favorite_recipes[rid]
+                    remove_favorite(st.session_state.username, rid)
+            else:
+                if st.button("🤍", key=f"fav_{rid}"):
+                    st.session_state.favorite_recipes[rid] = time.time()
+                    add_favorite(st.session_state.username, rid, st.session_state.favorite_recipes[rid])
+                    record_event(rid, "favorite")
+        
+        # Recipe content
+        st.markdown(format_recipe_display(recipe))
+        if recipe.tags:
+            st.write("**Tags:** " + ", ".join(recipe.tags))
+        
+        # Nutrition information
+        st.write("**Nutrition Information:**")
+        if recipe.calories is None:
+            st.caption("Nutrition information is not available yet.")
+        else:
+            nutrition_cols = st.columns(4)
+            with nutrition_cols[0]:
+                st.metric("Calories", f"{recipe.calories} kcal")
+            with nutrition_cols[1]:
+                st.metric("Protein", f"{recipe.protein}g")
+            with nutrition_cols[2]:
+                st.metric("Carbs", f"{recipe.carbs}g")
+            with nutrition_cols[3]:
+                st.metric("Fat", f"{recipe.fat}g")
+        
+        # Action buttons
+        col_x, col_y = st.columns(2)
+        with col_x:
+            if st.button("🛒 Add to Shopping List", key=f"shop_{rid}"):
+                # Ingredients are already split into items
+                st.session_state.shopping_list.extend(
+                    add_shopping_items(st.session_state.username, recipe.ingredients)
+                )
+                record_event(rid, "shopping_list")
+                st.success("Added to shopping list!")
+        with col_y:
+            if st.button("📅 Add to Meal Planner", key=f"plan_{rid}"):
+                new_meal = pd.DataFrame([{
+                    'date': datetime.today().strftime('%Y-%m-%d'),
+                    'meal': recipe.name
+                }])
+                st.session_state.meal_plan = pd.concat([st.session_state.meal_plan, new_meal], ignore_index=True)
+                add_meals(st.session_state.username, new_meal.itertuples(index=False))
+                record_event(rid, "meal_plan")
+                st.success("Added to meal planner!")
+
+
+def show_featured():
+    st.subheader("⭐ Featured Recipes")
+    # Trending ids come from the maintained top-K, so this never sorts the catalog
+    trending = get_trending(FEATURED_COUNT)
+    featured = get_recipes_by_ids([rid for rid, _ in trending])
+    if featured:
+        st.write("Trending with other cooks right now:")
+    else:
+        st.write("Here are some of the most popular recipes from around the world:")
+        featured = get_top_rated(FEATURED_COUNT, catalog_version())
+    
+    featured_cols = st.columns(len(featured))
+    for col, recipe in zip(featured_cols, featured):
+        with col:
+            st.write(f"**{recipe.name}**")
+            st.caption(f"{recipe.cuisine} · ⭐ {recipe.rating or 'N/A'}")
+
+def show_recommendations():
+    st.subheader("🎯 Recommended for You")
+    recommendations = use_prefetched(
+        st.session_state.prefetch, "recommendations",
+        lambda: get_precomputed_recommendations(st.session_state.username),
+        wait=0
+    )
+    if not recommendations:
+        if is_prefetching(st.session_state.prefetch, "recommendations"):
+            st.write("Your personalized recommendations are on their way.")
+            return
+        st.write("Your personalized recommendations are not ready yet.")
+        if st.button("✨ Get my recommendations", key="get_recommendations"):
+            user_details = current_profile()
+            if user_details:
+                with st.spinner("Finding recipes for you..."):
+                    recommendations = get_user_recommendations(user_details, st.session_state.username)
+                if recommendations:
+                    store_live_recommendations(user_details, recommendations)
+        if not recommendations:
+            return
+    
+    rec_cols = st.columns(len(recommendations))
+    for col, recommendation in zip(rec_cols, recommendations):
+        recipe = enrich_recommendation(recommendation)
+        with col:
+            with st.expander(recipe.name):
+                st.write(f"🔨 Difficulty: {recipe.difficulty or 'Pending'}")
+                st.markdown(format_recipe_display(recipe))
+                if recipe.tags:
+                    st.write("**Tags:** " + ", ".join(recipe.tags))
+                if recipe.calories is None:
+                    st.caption("Nutrition information is not available yet.")
+                else:
+                    st.caption(
+                        f"{recipe.calories} kcal · {recipe.protein}g protein · "
+                        f"{recipe.carbs}g carbs · {recipe.fat}g fat"
+                    )
+    usage = get_usage_stats().get("recommendations")
+    if usage:
+        st.caption(
+            f"Live recommendations: {usage['tokens_per_item']:.0f} tokens and "
+            f"{usage['latency_per_item']:.1f} s per recipe over {usage['calls']} calls"
+        )
 
 def show_favorites():
     st.header("❤️ My Favorite Recipes")
-    if not st.session_state.favorite_recipes:
+    favorites = st.session_state.favorite_recipes
+    if not favorites:
         st.info("You haven't added any recipes to your favorites yet.")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        search_query = st.text_input("Search favorites", "", key="fav_search").lower()
+    with col2:
+        cuisine_filter = st.selectbox(
+            "Filter by cuisine",
+            ["All", "Italian", "Indian", "Japanese", "French", "Mexican", "Chinese"],
+            key="fav_cuisine"
+        )
+    with col3:
+        sort_by = st.selectbox(
+            "Sort by",
+            ["Recently added", "Name", "Rating", "Cooking time"],
+            key="fav_sort"
+        )
+    
+    # Batched id lookup: only the user's favorites are touched, never the whole catalog
+    recipes = [
+        recipe for recipe in get_recipes_by_ids(favorites)
+        if recipe_matches(recipe, search_query, cuisine_filter, "All", None)
+    ]
+    if sort_by == "Recently added":
+        recipes.sort(key=lambda r: favorites[r.id], reverse=True)
+    elif sort_by == "Name":
+        recipes.sort(key=lambda r: r.name.lower())
+    elif sort_by == "Rating":
+        recipes.sort(key=lambda r: r.rating or 0, reverse=True)
     else:
-        for recipe_name in st.session_state.favorite_recipes:
-            st.write(f"- {recipe_name}")
+        recipes.sort(key=lambda r: r.minutes)
+    
+    if not recipes:
+        st.info("No favorites match your filters.")
+        return
+    
+    total_pages = max(1, -(-len(recipes) // RECIPES_PER_PAGE))
+    page = 0
+    if total_pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, key="fav_page") - 1
+    page_recipes = recipes[page * RECIPES_PER_PAGE:(page + 1) * RECIPES_PER_PAGE]
+    col1, col2 = st.columns(2)
+    for i, recipe in enumerate(page_recipes):
+        with col1 if i % 2 == 0 else col2:
+            show_recipe_card(with_enrichment(recipe))
+    st.caption(f"{len(recipes)} of {len(favorites)} favorites shown across {total_pages} pages")
 
 def show_shopping_list():
     st.header("🛒 Shopping List")
     if not st.session_state.shopping_list:
         st.info("Your shopping list is empty.")
     else:
-        for item in st.session_state.shopping_list:
+        for row in st.session_state.shopping_list:
             col1, col2 = st.columns([3, 1])
             with col1:
-                st.write(item)
+                st.write(row['item'])
             with col2:
-                if st.button("✅", key=f"remove_{item}"):
-                    st.session_state.shopping_list.remove(item)
+                # Keyed by row id: the same ingredient can be listed more than once
+                if st.button("✅", key=f"remove_{row['id']}"):
+                    st.session_state.shopping_list.remove(row)
+                    remove_shopping_item(st.session_state.username, row['id'])
                     st.rerun()
 
 def show_meal_planner():
@@ -392,6 +506,49 @@ def show_meal_planner():
                 'meal': meal
             }])
             st.session_state.meal_plan = pd.concat([st.session_state.meal_plan, new_meal], ignore_index=True)
+            add_meals(st.session_state.username, new_meal.itertuples(index=False))
+    
+    # Generate a plan from the recipe catalog
+    with st.expander("🪄 Generate a weekly plan"):
+        with st.form("generate_plan"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                daily_calories = st.number_input("Daily calories", min_value=800, max_value=5000, value=2000, step=100)
+                start_date = st.date_input("Start date", key="plan_start_date")
+            with col2:
+                daily_protein = st.number_input("Daily protein (g)", min_value=0, max_value=300, value=80, step=5)
+                meals_per_day = st.number_input("Meals per day", min_value=1, max_value=6, value=3)
+            with col3:
+                max_minutes = st.number_input("Max cooking minutes per day", min_value=10, max_value=600, value=120, step=10)
+                allow_repeats = st.checkbox("Allow repeated recipes")
+            generate = st.form_submit_button("Generate Plan")
+        if generate:
+            user_details = current_profile()
+            profile = normalize_profile(user_details) if user_details else None
+            solve_start = time.perf_counter()
+            pool = get_candidate_pool(catalog_version(), profile)
+            plan = plan_week(
+                pool, daily_calories, daily_protein, max_minutes,
+                meals_per_day=int(meals_per_day), allow_repeats=allow_repeats, start_date=start_date
+            )
+            solve_ms = (time.perf_counter() - solve_start) * 1000
+            new_meals = pd.DataFrame([
+                {'date': day['date'], 'meal': recipe.name}
+                for day in plan for recipe in day['meals']
+            ], columns=['date', 'meal'])
+            st.session_state.meal_plan = pd.concat([st.session_state.meal_plan, new_meals], ignore_index=True)
+            add_meals(st.session_state.username, new_meals.itertuples(index=False))
+            for day in plan:
+                for recipe in day['meals']:
+                    record_event(recipe.id, "meal_plan")
+            quality = plan_quality(plan, daily_calories, daily_protein, max_minutes)
+            if quality['meals'] < len(plan) * meals_per_day:
+                st.warning(f"Only {quality['meals']} meals fit your targets; some slots were left empty.")
+            st.caption(
+                f"Planned {quality['meals']} meals in {solve_ms:.0f} ms, "
+                f"average calorie error {quality['calorie_error']:.0%}, "
+                f"protein shortfall {quality['protein_shortfall']:.0%}"
+            )
     
     # Display meal plan
     if st.session_state.meal_plan.empty:
@@ -399,31 +556,87 @@ def show_meal_planner():
     else:
         st.dataframe(st.session_state.meal_plan.sort_values('date'))
 
+@memoize("chat_page", max_entries=256)
+def older_chat_page(username, before_id):
+    """A page of the chat log before ``before_id`` as markdown, its first id and whether more exist"""
+    # The log is append-only, so a page ending before a given id never changes
+    messages, has_older = load_chat_messages(username, CHAT_PAGE_SIZE, before_id=before_id)
+    return format_chat_transcript(messages), messages[0]["id"] if messages else None, has_older
+
+def show_older_chat(before_id):
+    st.session_state.chat_older_pages.append(before_id)
+
+def show_newer_chat():
+    st.session_state.chat_older_pages.pop()
+
+@fragment
+def show_chat_history():
+    """Render the recent bubbles and at most one older page; paging only reruns this part"""
+    pages = st.session_state.chat_older_pages
+    if pages:
+        transcript, first_id, has_older = older_chat_page(st.session_state.username, pages[-1])
+        if has_older:
+            st.button("⬆️ Older messages", key="chat_older", on_click=show_older_chat, args=(first_id,))
+        st.markdown(transcript)
+        st.button("⬇️ Newer messages", key="chat_newer", on_click=show_newer_chat)
+        st.divider()
+    elif st.session_state.chat_has_older:
+        st.button(
+            "⬆️ Show older messages", key="chat_older",
+            on_click=show_older_chat, args=(st.session_state.chat_history[0]["id"],)
+        )
+    for message in st.session_state.chat_history:
+        with st.chat_message(message["role"]):
+            st.write(message["content"])
+
 def show_chatbot():
     st.header("👩‍🍳 Recipe Chatbot")
     st.write("Ask me anything about recipes, cooking techniques, or ingredients!")
+    use_cache = st.checkbox("Answer repeated questions from cache", value=True, key="chat_use_cache")
+    use_prefetched(st.session_state.prefetch, "chat_cache", lambda: None, wait=0)
     
     try:
-        # Display chat history
-        for message in st.session_state.chat_history:
-            with st.chat_message(message["role"]):
-                st.write(message["content"])
+        show_chat_history()
         
         # Chat input
         if prompt := st.chat_input("Ask a question about recipes...", key="chat_input"):
-            # Add user message to chat history
-            st.session_state.chat_history.append({"role": "user", "content": prompt})
             with st.chat_message("user"):
                 st.write(prompt)
             
             # Get and display assistant response
-            response = get_chatbot_response(prompt, st.session_state.chatbot)
+            with st.spinner("Waiting for the assistant..."):
+                response = get_chatbot_response(
+                    prompt, st.session_state.chatbot,
+                    use_cache=use_cache, username=st.session_state.username
+                )
+            # A rate limited (None) question is dropped rather than logged unanswered
             if response:
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
                 with st.chat_message("assistant"):
                     st.write(response)
+                st.session_state.chat_history.extend(append_chat_messages(
+                    st.session_state.username,
+                    [{"role": "user", "content": prompt}, {"role": "assistant", "content": response}]
+                ))
+                if len(st.session_state.chat_history) > 2 * CHAT_PAGE_SIZE:
+                    # The oldest bubbles stay in the log, reachable a page at a time, so reruns stay O(visible)
+                    st.session_state.chat_history = st.session_state.chat_history[CHAT_PAGE_SIZE:]
+                    st.session_state.chat_has_older = True
+                    st.session_state.chat_older_pages = []
     except Exception as e:
         st.error(f"Error in chatbot: {e}")
+    
+    cache_stats = get_cache_stats()
+    st.caption(
+        f"Answer cache: {cache_stats['hit_rate']:.0%} hit rate, "
+        f"{cache_stats['saved_seconds']:.1f}s saved across {cache_stats['hits']} hits"
+    )
+    scheduler_stats = get_scheduler_stats()
+    user_wait = scheduler_stats['wait_by_user'].get(st.session_state.username)
+    if user_wait:
+        st.caption(
+            f"Queue: {scheduler_stats['queued']} waiting, "
+            f"your average wait {user_wait['avg_wait_seconds'] * 1000:.0f} ms"
+        )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
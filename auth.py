@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import os
 
+import shared_store
+
 # Constants for user data storage
 USER_DATA_FILE = "user_data.csv"
 
@@ -17,7 +19,29 @@ def load_user_data():
 def save_user_data(df):
     df.to_csv(USER_DATA_FILE, index=False)
 
-def login():
+def get_user_profile(username):
+    """Return a user's preferences as a dict, or None if the user does not exist.
+
+    Profiles are cached in the shared store, so app processes only re-read
+    the CSV after it changes.
+    """
+    modified = os.path.getmtime(USER_DATA_FILE) if os.path.exists(USER_DATA_FILE) else 0
+    cached = shared_store.get("profiles", username)
+    if cached and cached["modified"] == modified:
+        return cached["profile"]
+    user_data = load_user_data()
+    user = user_data[user_data['username'] == username]
+    if user.empty:
+        return None
+    profile = {
+        field: (value if pd.notna(value) else "")
+        for field, value in user.iloc[0].to_dict().items()
+        if field != 'password'
+    }
+    shared_store.put("profiles", username, {"modified": modified, "profile": profile})
+    return profile
+
+def login(on_success=None):
     st.subheader("Login")
     
     username = st.text_input("Username")
@@ -30,6 +54,8 @@ def login():
         if not user.empty:
             st.session_state.logged_in = True
             st.session_state.username = username
+            if on_success is not None:
+                on_success(username)
             st.success("Login successful!")
             st.rerun()
         else:
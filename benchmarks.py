@@ -0,0 +1,439 @@
+"""Micro-benchmarks for the app's hot paths.
+
+Run from the repository root, e.g. ``python benchmarks.py docs``.
+"""
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+def time_calls(fn, repeat):
+    """Call fn repeatedly and return the elapsed seconds of each call"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def report(label, samples):
+    """Print median, best and worst timings in milliseconds"""
+    print(
+        f"{label:<45} median {statistics.median(samples) * 1000:9.2f} ms  "
+        f"min {min(samples) * 1000:9.2f} ms  max {max(samples) * 1000:9.2f} ms"
+    )
+
+def _docs_all_sections_app():
+    # Previous behaviour: every tab rendered on each visit
+    import streamlit as st
+    import docs
+    st.title("Project Documentation")
+    for render in docs.DOC_SECTIONS.values():
+        render()
+
+def _docs_active_section_app():
+    from docs import show_documentation
+    show_documentation()
+
+def bench_docs(repeat):
+    """Documentation page: all sections versus only the active one"""
+    from streamlit.testing.v1 import AppTest
+
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import docs"], check=True)
+    report("import docs (fresh interpreter)", [time.perf_counter() - started])
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import plotly.graph_objects"], check=False)
+    report("import plotly.graph_objects (previously paid)", [time.perf_counter() - started])
+
+    for label, app in [("render all sections (before)", _docs_all_sections_app),
+                       ("render active section (after)", _docs_active_section_app)]:
+        AppTest.from_function(app).run()  # warm caches
+        report(label, time_calls(lambda: AppTest.from_function(app).run(), repeat))
+
+def synthetic_recipes(count, seed=42):
+    """Generate catalog-shaped recipes with random nutrition and cooking times"""
+    rng = random.Random(seed)
+    cuisines = ["Italian", "Indian", "Japanese", "French", "Mexican", "Chinese"]
+    categories = ["vegetarian", "non-vegetarian", "desserts"]
+    recipes = []
+    for i in range(count):
+        minutes = rng.choice([10, 15, 20, 25, 30, 40, 45, 60, 90])
+        recipes.append({
+            "id": f"synthetic-recipe-{i}",
+            "name": f"Synthetic Recipe {i}",
+            "cuisine": rng.choice(cuisines),
+            "category": rng.choice(categories),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "difficulty": rng.choice(["Easy", "Medium", "Hard"]),
+            "ingredients": f"- {rng.randint(1, 4)} cup rice\n- {rng.randint(1, 3)} tbsp olive oil\n- 1 onion",
+            "instructions": f"1. Prepare\n2. Cook for {minutes} minutes\n3. Serve",
+            "cooking_time": f"{minutes} minutes",
+            "nutrition": {
+                "calories": rng.randint(120, 950),
+                "protein": rng.randint(2, 60),
+                "carbs": rng.randint(5, 120),
+                "fat": rng.randint(1, 50),
+            },
+        })
+    return recipes
+
+def synthetic_records(count, seed=42):
+    """Synthetic recipes as catalog records"""
+    from recipes import Recipe
+    return [Recipe.from_dict(data) for data in synthetic_recipes(count, seed)]
+
+def bench_planner(repeat):
+    """Weekly meal plan over a 100k-recipe candidate pool"""
+    from meal_planner import build_candidate_pool, plan_quality, plan_week
+
+    recipes = synthetic_records(100_000)
+    targets = {"daily_calories": 2000, "daily_protein": 100, "max_minutes_per_day": 90}
+    report("build candidate pool (100k recipes)", time_calls(lambda: build_candidate_pool(recipes), max(1, repeat // 5)))
+    pool = build_candidate_pool(recipes)
+    report("plan week (3 meals/day)", time_calls(lambda: plan_week(pool, **targets), repeat))
+    quality = plan_quality(plan_week(pool, **targets), **targets)
+    print(
+        f"plan quality: calorie error {quality['calorie_error']:.1%}, "
+        f"protein shortfall {quality['protein_shortfall']:.1%}, "
+        f"days over time {quality['days_over_time']}, meals {quality['meals']}"
+    )
+
+SEARCH_QUERIES = [
+    ("recipe 1", "All", "All", None),
+    ("", "Italian", "Quick (< 30 mins)", None),
+    ("", "All", "All", "vegetarian"),
+    ("9", "Indian", "All", "quick-meals"),
+    ("", "All", "Long (> 60 mins)", None),
+]
+
+def bench_search(repeat):
+    """Catalog search: in-process filtering versus the mmap index and process pool"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from recipe_index import build_recipe_index, init_search_worker, open_recipe_index, search_in_worker, search_index
+    from recipes import filter_recipes
+
+    recipes = synthetic_records(200_000)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recipe_index.bin")
+        report("build index (200k recipes)", time_calls(
+            lambda: build_recipe_index(recipes, path, "bench"), 1
+        ))
+        index = open_recipe_index(path)
+        report("filter_recipes, in process", time_calls(
+            lambda: [list(filter_recipes(recipes, *query)) for query in SEARCH_QUERIES], max(1, repeat // 5)
+        ))
+        report("search_index, in process", time_calls(
+            lambda: [search_index(index, *query) for query in SEARCH_QUERIES], max(1, repeat // 5)
+        ))
+
+        # Throughput as concurrent sessions' queries are spread over more workers
+        workload = SEARCH_QUERIES * max(4, repeat)
+        worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+        for workers in worker_counts:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_search_worker,
+                initargs=(path,)
+            ) as pool:
+                list(pool.map(search_in_worker, *zip(*SEARCH_QUERIES)))  # start and warm the workers
+                started = time.perf_counter()
+                list(pool.map(search_in_worker, *zip(*workload)))
+                elapsed = time.perf_counter() - started
+            print(f"{workers} search workers: {len(workload) / elapsed:8.1f} queries/s")
+
+def _traced_memory(build):
+    """Build something under tracemalloc; return it with the bytes it retains"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def _render_page_dicts(page):
+    # Previous behaviour: every card copied its dict and re-parsed the recipe text
+    from recipes import cooking_minutes
+    rendered = []
+    for recipe in page:
+        merged = dict(recipe)
+        display = {field: merged.get(field, '') for field in ('name', 'ingredients', 'instructions', 'cooking_time')}
+        shopping = [line.strip() for line in merged['ingredients'].split('\n') if line.strip().startswith('-')]
+        rendered.append((display, shopping, cooking_minutes(merged['cooking_time'])))
+    return rendered
+
+def _render_page_records(page):
+    from utils import format_recipe_display
+    return [(format_recipe_display(recipe), recipe.ingredients, recipe.minutes) for recipe in page]
+
+def bench_records(repeat):
+    """Catalog memory per recipe and per-rerun allocations: dicts versus records"""
+    from recipes import RECIPES_PER_PAGE
+
+    count = 100_000
+    dicts, dict_bytes = _traced_memory(lambda: synthetic_recipes(count))
+    records, record_bytes = _traced_memory(lambda: synthetic_records(count))
+    print(f"dict recipes:    {dict_bytes / count:8.0f} bytes per recipe")
+    print(f"recipe records:  {record_bytes / count:8.0f} bytes per recipe")
+
+    for label, render, page in [("render page, dicts (before)", _render_page_dicts, dicts[:RECIPES_PER_PAGE]),
+                                ("render page, records (after)", _render_page_records, records[:RECIPES_PER_PAGE])]:
+        render(page)  # warm caches, as on a rerun
+        peaks = []
+        for _ in range(repeat):
+            tracemalloc.start()
+            render(page)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        report(label, time_calls(lambda: render(page), repeat))
+        print(f"{'':<45} peak {statistics.median(peaks) / 1024:9.1f} KiB allocated per rerun")
+
+def _typo(word, rng):
+    """Apply one random deletion, insertion, substitution or transposition"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    i = rng.randrange(len(word))
+    edit = rng.choice(["delete", "insert", "substitute", "transpose"])
+    if edit == "delete" and len(word) > 4:
+        return word[:i] + word[i + 1:]
+    if edit == "insert":
+        return word[:i] + rng.choice(letters) + word[i:]
+    if edit == "transpose" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(letters) + word[i + 1:]
+
+def bench_ingredients(repeat):
+    """Ingredient resolution: BK-tree versus a linear scan, cached lookups and catalog lines"""
+    import ingredients
+
+    rng = random.Random(42)
+    names = [(name, ingredients.resolve_ingredient(name)) for name in ingredients._VOCABULARY if len(name) >= 6]
+    typed = [(_typo(name, rng), canonical) for name, canonical in rng.choices(names, k=500)]
+    terms = [term for term, _ in typed]
+
+    def linear_scan(term):
+        # Baseline: compare against every vocabulary entry
+        term = ingredients.normalize_term(term)
+        limit = ingredients._max_typos(term)
+        best = min(
+            ((ingredients.edit_distance(term, name), name) for name in ingredients._VOCABULARY if name[0] == term[0]),
+            default=(limit + 1, None)
+        )
+        return ingredients._VOCABULARY[best[1]] if best[0] <= limit else None
+
+    def resolve_cold():
+        ingredients.resolve_ingredient.cache_clear()
+        return [ingredients.resolve_ingredient(term) for term in terms]
+
+    for label, run in [("typo'd terms, linear scan", lambda: [linear_scan(term) for term in terms]),
+                       ("typo'd terms, BK-tree (cold cache)", resolve_cold)]:
+        samples = time_calls(run, max(1, repeat // 4))
+        report(label, samples)
+        print(f"{'':<45} {len(terms) / statistics.median(samples):9.0f} terms/s")
+    resolved = resolve_cold()
+    correct = sum(result == canonical for result, (_, canonical) in zip(resolved, typed))
+    print(f"{'':<45} {correct / len(typed):9.1%} resolved to the intended ingredient")
+
+    samples = time_calls(lambda: [ingredients.resolve_ingredient(term) for term in terms], repeat)
+    report("typo'd terms, cached (rerun)", samples)
+    print(f"{'':<45} {len(terms) / statistics.median(samples):9.0f} terms/s")
+
+    lines = tuple(
+        f"- {rng.randint(1, 4)} {rng.choice(['cup', 'tbsp', 'g'])} {rng.choice(['chopped ', 'fresh ', ''])}{name}"
+        for name, _ in rng.choices(names, k=2000)
+    )
+
+    def resolve_lines():
+        ingredients.resolve_line.cache_clear()
+        ingredients.resolve_ingredient.cache_clear()
+        return [ingredients.resolve_line(line) for line in lines]
+
+    samples = time_calls(resolve_lines, max(1, repeat // 4))
+    report("catalog lines (cold cache)", samples)
+    print(f"{'':<45} {len(lines) / statistics.median(samples):9.0f} lines/s")
+
+# Question pairs and whether the second may be served the first one's cached answer
+CACHE_CHECKS = [
+    ("What can I use instead of butter?", "substitute for butter", True),
+    ("How do I make pizza dough?", "how to make pizza dough", True),
+    ("how to make tomato sauce", "how to make tomatoes sauce", True),
+    ("How long should I boil eggs?", "how long to boil eggs", True),
+    ("pizza dough with yeast", "pizza dough without yeast", False),
+    ("lasagna recipe", "vegan lasagna recipe", False),
+    ("how long to bake chicken at 350", "how long to bake chicken at 400", False),
+    ("is chicken safe to eat", "is chicken safe to eat raw", False),
+    ("how to cook rice", "how to cook brown rice", False),
+]
+
+def bench_response_cache(repeat):
+    """Chat answer cache: near-miss and paraphrase checks, and lookup latency"""
+    import response_cache
+
+    failures = 0
+    for cached, asked, expected in CACHE_CHECKS:
+        response_cache.clear_cache()
+        response_cache.store_answer(cached, "answer", 1.0)
+        served = response_cache.lookup_answer(asked) is not None
+        score = response_cache.cosine_similarity(
+            response_cache.embed_question(cached), response_cache.embed_question(asked)
+        )
+        status = "ok" if served == expected else "WRONG"
+        failures += served != expected
+        print(f"{status:<5} {'hit ' if served else 'miss'} cosine {score:.2f}  {cached!r} / {asked!r}")
+
+    response_cache.clear_cache()
+    for i in range(response_cache.CACHE_MAX_ENTRIES):
+        response_cache.store_answer(f"how to cook recipe number {i} with rice", "answer", 1.0)
+    report(f"lookup over {response_cache.CACHE_MAX_ENTRIES} entries", time_calls(
+        lambda: response_cache.lookup_answer("how to cook recipe number 7 with rice"), repeat
+    ))
+    response_cache.clear_cache()
+    if failures:
+        raise SystemExit(f"{failures} cache checks failed")
+
+def bench_enrichment(repeat):
+    """Recommendation enrichment: catalog fields are kept and LLM recipes get their own entries"""
+    import shared_store
+
+    with tempfile.TemporaryDirectory() as directory:
+        shared_store.SHARED_CACHE_DB = os.path.join(directory, "shared_cache.db")
+        import enrichment
+        from recipes import get_recipe
+
+        enrichment.client = None  # Stay offline; local estimates are enough here
+        catalog = get_recipe("sushi-roll")
+        stored = catalog.to_dict()
+        written = {key: stored[key] for key in ("name", "ingredients", "instructions", "cooking_time")}
+        from_catalog = enrichment.enrich_recommendation(stored)
+        retired = enrichment.enrich_recommendation(dict(stored, id="retired-sushi-roll"))
+        from_llm = enrichment.enrich_recommendation(written)
+        enrichment._process_batch([from_llm])
+
+        checks = [
+            ("catalog recommendation keeps catalog nutrition",
+             (from_catalog.calories, from_catalog.difficulty) == (catalog.calories, catalog.difficulty)),
+            ("stored recommendation keeps its own fields",
+             (retired.calories, retired.difficulty, retired.tags) == (catalog.calories, catalog.difficulty, catalog.tags)),
+            ("LLM recipe gets its own enrichment key",
+             enrichment.recipe_key(from_llm) != enrichment.recipe_key(catalog)),
+            ("LLM estimate does not reach the catalog recipe",
+             enrichment.recipe_key(catalog) not in enrichment._store),
+        ]
+        failures = 0
+        for label, passed in checks:
+            failures += not passed
+            print(f"{'ok' if passed else 'WRONG':<5} {label}")
+
+        report("enrich_recommendation (catalog)", time_calls(lambda: enrichment.enrich_recommendation(stored), repeat))
+        report("enrich_recommendation (LLM)", time_calls(lambda: enrichment.enrich_recommendation(written), repeat))
+    if failures:
+        raise SystemExit(f"{failures} enrichment checks failed")
+
+def bench_chat(repeat):
+    """Chat turns against fake_llm.py: a 429 leaves the conversation untouched"""
+    import copy
+    import itertools
+    import chatbot
+    import fake_llm
+    from groq import Groq
+
+    config = fake_llm.build_parser().parse_args(["--port", "0", "--latency", "fixed", "--mean-ms", "5"])
+    server = fake_llm.start_fake_server(config)
+    chatbot.client = Groq(base_url=f"http://{config.host}:{server.server_port}", api_key="fake", max_retries=0)
+    users = (f"bench-{i}" for i in itertools.count())
+
+    fresh = chatbot.initialize_chatbot()
+    ongoing = chatbot.initialize_chatbot()
+    chatbot.get_chatbot_response("How do I make a roux?", ongoing, use_cache=False, username=next(users))
+    before = copy.deepcopy([fresh["messages"], ongoing["messages"]])
+    config.rate_limit_rate = 1.0
+    rejected = [
+        chatbot.get_chatbot_response("Can I freeze cooked rice?", state, use_cache=False, username=next(users))
+        for state in (fresh, ongoing)
+    ]
+    config.rate_limit_rate = 0.0
+    checks = [
+        ("429 returns None", rejected == [None, None]),
+        ("429 leaves the conversation unchanged", [fresh["messages"], ongoing["messages"]] == before),
+        ("first turn stays cacheable after a 429", all(m["role"] == "system" for m in fresh["messages"])),
+    ]
+    chatbot.get_chatbot_response("Can I freeze cooked rice?", ongoing, use_cache=False, username=next(users))
+    roles = [m["role"] for m in ongoing["messages"]]
+    checks.append(("answered turn adds one user and one assistant message", roles == ["system"] + ["user", "assistant"] * 2))
+    failures = 0
+    for label, passed in checks:
+        failures += not passed
+        print(f"{'ok' if passed else 'WRONG':<5} {label}")
+
+    report("chat turn (fake server, 5 ms)", time_calls(lambda: chatbot.get_chatbot_response(
+        "How do I make a roux?", chatbot.initialize_chatbot(), use_cache=False, username=next(users)
+    ), repeat))
+    server.shutdown()
+    if failures:
+        raise SystemExit(f"{failures} chat checks failed")
+
+# Favorites rows an import must reject without stopping
+BAD_FAVORITES = [
+    {"username": "bad", "recipe_id": "sushi-roll", "added_at": "yesterday"},
+    {"username": "bad", "recipe_id": "butter-chicken", "added_at": {"day": 1}},
+    {"username": "bad", "recipe_id": "chocolate-lava-cake", "added_at": "nan"},
+    {"username": "bad", "added_at": 1700000000},
+]
+
+def bench_bulk(repeat):
+    """Bulk favorites import: malformed rows are rejected, and import throughput"""
+    import json
+    import user_store
+
+    rows = 20_000
+    with tempfile.TemporaryDirectory() as directory:
+        user_store.USER_STORE_DB = os.path.join(directory, "user_store.db")
+        import bulk_data
+
+        path = os.path.join(directory, "favorites.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(rows):
+                f.write(json.dumps({"username": f"user{i % 500}", "recipe_id": f"recipe-{i}", "added_at": 1700000000 + i}) + "\n")
+                if i == rows // 2:
+                    f.writelines(json.dumps(row) + "\n" for row in BAD_FAVORITES)
+        result = bulk_data.import_dataset("favorites", path, batch_size=1000)
+        stored = bulk_data.get_connection().execute("SELECT COUNT(*) FROM favorites").fetchone()[0]
+        expected = {"rows": rows, "rejected": len(BAD_FAVORITES), "stored": rows}
+        actual = {"rows": result["rows"], "rejected": result["rejected"], "stored": stored}
+        status = "ok" if actual == expected else "WRONG"
+        print(f"{status:<5} malformed favorites rejected, the rest imported: {actual}")
+
+        samples = time_calls(lambda: bulk_data.import_dataset("favorites", path, batch_size=1000, restart=True), max(1, repeat // 4))
+        report(f"import {rows} favorites", samples)
+        print(f"{'':<45} {rows / statistics.median(samples):9.0f} rows/s")
+    if status != "ok":
+        raise SystemExit("bulk import check failed")
+
+BENCHMARKS = {
+    "bulk": bench_bulk,
+    "cache": bench_response_cache,
+    "chat": bench_chat,
+    "docs": bench_docs,
+    "enrichment": bench_enrichment,
+    "ingredients": bench_ingredients,
+    "planner": bench_planner,
+    "records": bench_records,
+    "search": bench_search,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run app micro-benchmarks")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name](args.repeat)
@@ -0,0 +1,284 @@
+"""Streaming bulk import and export of users, favorites, meal plans and shopping lists.
+
+    python bulk_data.py export favorites favorites.jsonl
+    python bulk_data.py import users users.parquet --batch-size 5000
+
+Files are read and written in batches, so memory stays bounded whatever
+their size. JSONL needs nothing extra; Parquet needs pyarrow. Every import
+batch is committed in the same transaction as the job's progress, so an
+interrupted import resumes where it stopped when the same command is run
+again.
+
+Users are staged in the user store and merged into user_data.csv with a
+single atomic file replace at the end of the import; imported rows win over
+existing users with the same username. Run user imports while signups are
+paused, since a signup during the final merge can be overwritten.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import time
+
+from auth import USER_DATA_FILE
+from user_store import get_connection
+from utils import USER_COLUMNS
+
+# Rows read, written and committed at a time
+DEFAULT_BATCH_SIZE = 10_000
+
+# Columns of each dataset, in export order
+DATASETS = {
+    "users": USER_COLUMNS,
+    "favorites": ["username", "recipe_id", "added_at"],
+    "meal_plans": ["username", "date", "meal"],
+    "shopping_lists": ["username", "item"],
+}
+
+_BULK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bulk_imports (
+    job TEXT PRIMARY KEY, dataset TEXT NOT NULL, source TEXT NOT NULL,
+    rows_done INTEGER NOT NULL, rejected INTEGER NOT NULL, finished INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bulk_users (username TEXT PRIMARY KEY, row TEXT NOT NULL);
+"""
+
+# Statements writing one cleaned row of each dataset
+_INSERTS = {
+    "users": "INSERT INTO bulk_users (username, row) VALUES (?, ?) "
+             "ON CONFLICT (username) DO UPDATE SET row = excluded.row",
+    "favorites": "INSERT INTO favorites (username, recipe_id, added_at) VALUES (?, ?, ?) "
+                 "ON CONFLICT (username, recipe_id) DO UPDATE SET added_at = excluded.added_at",
+    "meal_plans": "INSERT INTO meal_plans (username, date, meal) VALUES (?, ?, ?)",
+    "shopping_lists": "INSERT INTO shopping_lists (username, item) VALUES (?, ?)",
+}
+
+def _connection():
+    """User store connection with the bulk job tables in place"""
+    connection = get_connection()
+    connection.executescript(_BULK_SCHEMA)
+    return connection
+
+def _pyarrow():
+    """Import pyarrow, which is only needed for Parquet files"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet files need pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+def detect_format(path, requested=None):
+    """Pick jsonl or parquet from --format or the file extension"""
+    if requested:
+        return requested
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "jsonl"
+
+def batched(rows, batch_size):
+    """Group an iterable of rows into lists of at most batch_size"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def read_batches(path, fmt, batch_size, skip=0):
+    """Yield lists of row dicts from a file, skipping the first ``skip`` rows"""
+    if fmt == "parquet":
+        _, parquet = _pyarrow()
+        for record_batch in parquet.ParquetFile(path).iter_batches(batch_size=batch_size):
+            rows = record_batch.to_pylist()
+            if skip >= len(rows):
+                skip -= len(rows)
+                continue
+            yield rows[skip:]
+            skip = 0
+        return
+
+    def rows():
+        remaining = skip
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if remaining:
+                    remaining -= 1
+                    continue
+                yield json.loads(line)
+    yield from batched(rows(), batch_size)
+
+def write_batches(path, fmt, columns, batches):
+    """Write batches of row tuples to a file atomically; return the row count"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    count = 0
+    if fmt == "parquet":
+        pa, parquet = _pyarrow()
+        schema = pa.schema([
+            (name, pa.float64() if name == "added_at" else pa.string()) for name in columns
+        ])
+        with parquet.ParquetWriter(tmp_path, schema) as writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_pylist([dict(zip(columns, row)) for row in batch], schema=schema))
+                count += len(batch)
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for batch in batches:
+                f.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in batch)
+                count += len(batch)
+    os.replace(tmp_path, path)
+    return count
+
+def _csv_batches(batch_size):
+    """Stream user_data.csv as batches of row tuples in USER_COLUMNS order"""
+    if not os.path.exists(USER_DATA_FILE):
+        return
+    with open(USER_DATA_FILE, newline="", encoding="utf-8") as f:
+        rows = (tuple(row.get(name) or "" for name in USER_COLUMNS) for row in csv.DictReader(f))
+        yield from batched(rows, batch_size)
+
+def _store_batches(dataset, batch_size):
+    """Stream a user store table as batches of row tuples"""
+    cursor = _connection().execute(f"SELECT {', '.join(DATASETS[dataset])} FROM {dataset} ORDER BY rowid")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+def export_dataset(dataset, path, fmt=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Export a dataset to a JSONL or Parquet file; return the number of rows"""
+    batches = _csv_batches(batch_size) if dataset == "users" else _store_batches(dataset, batch_size)
+    return write_batches(path, detect_format(path, fmt), DATASETS[dataset], batches)
+
+def clean_row(dataset, row):
+    """Turn an imported row into insert parameters, or None if it is unusable"""
+    username = str(row.get("username") or "").strip()
+    if not username:
+        return None
+    if dataset == "users":
+        values = {name: "" if row.get(name) is None else str(row.get(name)) for name in USER_COLUMNS}
+        values["username"] = username
+        return username, json.dumps(values)
+    if dataset == "favorites":
+        recipe_id = str(row.get("recipe_id") or "").strip()
+        try:
+            added_at = float(row.get("added_at") or time.time())
+        except (TypeError, ValueError):
+            return None
+        return (username, recipe_id, added_at) if recipe_id and math.isfinite(added_at) else None
+    if dataset == "meal_plans":
+        date, meal = str(row.get("date") or "").strip(), str(row.get("meal") or "").strip()
+        return (username, date, meal) if date and meal else None
+    item = str(row.get("item") or "").strip()
+    return (username, item) if item else None
+
+def _job_id(dataset, path):
+    """Identify an import by dataset and source file contents, so edits start a new job"""
+    stat = os.stat(path)
+    source = f"{dataset}:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+def _publish_users(connection, batch_size):
+    """Merge staged users into user_data.csv with one atomic file replace"""
+    # Keep existing users that the import does not replace
+    for batch in _csv_batches(batch_size):
+        connection.execute("BEGIN IMMEDIATE")
+        connection.executemany(
+            "INSERT OR IGNORE INTO bulk_users (username, row) VALUES (?, ?)",
+            [(row[0], json.dumps(dict(zip(USER_COLUMNS, row)))) for row in batch if row[0]]
+        )
+        connection.execute("COMMIT")
+    tmp_path = f"{USER_DATA_FILE}.{os.getpid()}.tmp"
+    cursor = connection.execute("SELECT row FROM bulk_users ORDER BY rowid")
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=USER_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            writer.writerows(json.loads(row) for (row,) in rows)
+    os.replace(tmp_path, USER_DATA_FILE)
+
+def import_dataset(dataset, path, fmt=None, batch_size=DEFAULT_BATCH_SIZE, restart=False):
+    """Import a JSONL or Parquet file in transactional batches, resuming earlier progress.
+
+    Returns a dict with the rows imported, rows rejected as unusable, and
+    whether the job resumed or had already finished.
+    """
+    connection = _connection()
+    job = _job_id(dataset, path)
+    if restart:
+        connection.execute("DELETE FROM bulk_imports WHERE job = ?", (job,))
+        if dataset == "users":
+            connection.execute("DELETE FROM bulk_users")
+    progress = connection.execute(
+        "SELECT rows_done, rejected, finished FROM bulk_imports WHERE job = ?", (job,)
+    ).fetchone()
+    if progress and progress[2]:
+        return {"rows": progress[0] - progress[1], "rejected": progress[1], "resumed": False, "already_done": True}
+    if progress is None and dataset == "users":
+        # Left behind by an abandoned user import of another file
+        connection.execute("DELETE FROM bulk_users")
+    rows_done, rejected = progress[:2] if progress else (0, 0)
+
+    for batch in read_batches(path, detect_format(path, fmt), batch_size, skip=rows_done):
+        cleaned = [clean_row(dataset, row) for row in batch]
+        valid = [row for row in cleaned if row is not None]
+        rows_done += len(batch)
+        rejected += len(batch) - len(valid)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(_INSERTS[dataset], valid)
+            connection.execute(
+                "INSERT INTO bulk_imports (job, dataset, source, rows_done, rejected, finished, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?) ON CONFLICT (job) DO UPDATE SET "
+                "rows_done = excluded.rows_done, rejected = excluded.rejected, updated_at = excluded.updated_at",
+                (job, dataset, os.path.abspath(path), rows_done, rejected, time.time())
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    if dataset == "users":
+        _publish_users(connection, batch_size)
+    connection.execute("BEGIN IMMEDIATE")
+    connection.execute(
+        "INSERT INTO bulk_imports (job, dataset, source, rows_done, rejected, finished, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, 1, ?) ON CONFLICT (job) DO UPDATE SET finished = 1, updated_at = excluded.updated_at",
+        (job, dataset, os.path.abspath(path), rows_done, rejected, time.time())
+    )
+    if dataset == "users":
+        connection.execute("DELETE FROM bulk_users")
+    connection.execute("COMMIT")
+    return {"rows": rows_done - rejected, "rejected": rejected, "resumed": progress is not None, "already_done": False}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import or export users, favorites, meal plans and shopping lists")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("dataset", choices=list(DATASETS))
+    parser.add_argument("path", help="JSONL or Parquet file")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], help="Default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Ignore progress of an earlier run of this import")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    if args.action == "export":
+        count = export_dataset(args.dataset, args.path, args.format, args.batch_size)
+        print(f"Exported {count} {args.dataset} rows to {args.path} in {time.perf_counter() - started:.1f}s")
+    else:
+        result = import_dataset(args.dataset, args.path, args.format, args.batch_size, args.restart)
+        if result["already_done"]:
+            print(f"{args.path} was already imported ({result['rows']} rows); use --restart to import it again")
+        else:
+            print(
+                f"Imported {result['rows']} {args.dataset} rows ({result['rejected']} rejected"
+                f"{', resumed' if result['resumed'] else ''}) in {time.perf_counter() - started:.1f}s"
+            )
@@ -1,7 +1,14 @@
 import streamlit as st
-from groq import Groq
+from groq import Groq, RateLimitError as UpstreamRateLimitError
 from dotenv import load_dotenv
+import json
 import os
+import re
+import time
+
+from response_cache import lookup_answer, store_answer
+from rate_limit import RateLimitExceeded, llm_slot
+from llm_usage import record_usage
 
 # Load environment variables
 load_dotenv()
@@ -11,7 +18,9 @@ try:
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         raise ValueError("GROQ_API_KEY not found in environment variables")
-    client = Groq()  # Ensure no unsupported arguments are passed
+    base_url = os.getenv("GROQ_BASE_URL") or None  # Allows pointing at fake_llm.py
+    # Against a test server, surface injected 429s and 500s instead of retrying them silently
+    client = Groq(base_url=base_url, max_retries=0 if base_url else 2)
     client.api_key = api_key  # Set the API key separately
 except ImportError:
     st.error("Groq module not found. Please ensure it is installed.")
@@ -20,6 +29,43 @@ except Exception as e:
     st.error(f"Error initializing Groq client: {e}")
     client = None
 
+# Recipes returned per recommendation request
+RECOMMENDATION_COUNT = 3
+
+# Output token budget: the JSON wrapper plus a fixed allowance per recipe
+RECOMMENDATION_TOKENS_BASE = 40
+RECOMMENDATION_TOKENS_PER_RECIPE = 300
+
+# Compact structured-output prompt; the reply must match this schema
+RECOMMENDATION_PROMPT = (
+    "Recommend {count} recipes for: {profile}.\n"
+    'Reply with JSON only: {{"recipes":[{{"name":str,"ingredients":[str],"steps":[str],"minutes":int}}]}}. '
+    "Short ingredient lines and steps."
+)
+
+# Original free-text prompt, kept for comparison and for models without JSON mode
+FREE_TEXT_RECOMMENDATION_PROMPT = """Based on the following user details, provide {count} personalized recipe recommendations:
+        {details}
+        
+        For each recipe, include:
+        1. Recipe name
+        2. List of ingredients
+        3. Step-by-step instructions
+        4. Estimated cooking time
+        """
+
+# Profile fields sent to the model, with the short labels used in the compact prompt
+PROFILE_FIELDS = [
+    ("favorite_cuisine", "cuisine"),
+    ("dietary_restrictions", "diet"),
+    ("preferred_ingredients", "likes"),
+    ("ingredients_to_avoid", "avoid"),
+    ("cooking_skill", "skill"),
+    ("favorite_meal", "meal"),
+    ("spice_level", "spice"),
+    ("cooking_time_preference", "time"),
+]
+
 def initialize_chatbot():
     """Initialize the chatbot with system message"""
     return {
@@ -38,32 +84,59 @@ def initialize_chatbot():
         ]
     }
 
-def get_chatbot_response(user_input, chatbot_state):
-    """Get response from the chatbot using Groq model"""
+def get_chatbot_response(user_input, chatbot_state, use_cache=True, username=None):
+    """Get response from the chatbot using Groq model.
+
+    First-turn questions are stateless, so their answers are served from and
+    stored in the semantic response cache unless ``use_cache`` is False.
+    Calls to the model are rate limited and fairly scheduled per ``username``;
+    None is returned when the request is rejected here or by the API. The
+    conversation state only changes once a question has been answered.
+    """
+    cacheable = use_cache and all(m["role"] == "system" for m in chatbot_state["messages"])
+    if cacheable:
+        cached = lookup_answer(user_input)
+        if cached is not None:
+            chatbot_state["messages"].append({"role": "user", "content": user_input})
+            chatbot_state["messages"].append({"role": "assistant", "content": cached})
+            return cached
+    
     if client is None:
         st.error("Groq client not initialized. Please check your API key.")
         return "I apologize, but I'm having trouble connecting to the AI service."
         
     try:
-        # Add user message to chat history
-        chatbot_state["messages"].append({"role": "user", "content": user_input})
-        
-        # Get response from Groq model
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # Updated model name
-            messages=chatbot_state["messages"],
-            temperature=0.7,
-            max_tokens=1000,
-            top_p=0.9,
-            presence_penalty=0.1
-        )
+        with llm_slot(username):
+            # The user message joins the history only once answered, so a rejected turn leaves no trace
+            user_message = {"role": "user", "content": user_input}
+            
+            # Get response from Groq model
+            started = time.perf_counter()
+            completion = client.chat.completions.create(
+                model="llama-3.3-70b-versatile",  # Updated model name
+                messages=chatbot_state["messages"] + [user_message],
+                temperature=0.7,
+                max_tokens=1000,
+                top_p=0.9,
+                presence_penalty=0.1
+            )
+            record_usage("chat", completion, time.perf_counter() - started)
         
         # Extract and store the response
         response = completion.choices[0].message.content
+        chatbot_state["messages"].append(user_message)
         chatbot_state["messages"].append({"role": "assistant", "content": response})
+        if cacheable:
+            store_answer(user_input, response, time.perf_counter() - started)
         
         return response
         
+    except RateLimitExceeded as e:
+        st.warning(f"{e} Please try again in {e.retry_after:.0f} seconds.")
+        return None
+    except UpstreamRateLimitError:
+        st.warning("The AI service is busy right now. Please try again shortly.")
+        return None
     except Exception as e:
         if "model_decommissioned" in str(e) or "model_not_found" in str(e):
             st.error("The selected model is unavailable. Please update to a supported model.")
@@ -71,47 +144,161 @@ def get_chatbot_response(user_input, chatbot_state):
             st.error(f"Error getting chatbot response: {e}")
         return "I apologize, but I'm having trouble processing your request. Please try again."
 
-def get_user_recommendations(user_details):
-    """Get personalized recommendations for the user using Groq LLM."""
+def compact_profile(user_details):
+    """Render the filled-in profile fields as short 'label=value' pairs"""
+    parts = []
+    for field, label in PROFILE_FIELDS:
+        value = user_details.get(field)
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(value)
+        value = str(value or "").strip()
+        if value and value.lower() != "nan" and not value.lower().startswith("e.g."):
+            parts.append(f"{label}={value}")
+    return "; ".join(parts)
+
+def recommendation_token_budget(count):
+    """max_tokens for a structured reply with ``count`` recipes"""
+    return RECOMMENDATION_TOKENS_BASE + RECOMMENDATION_TOKENS_PER_RECIPE * count
+
+def get_user_recommendations(user_details, username=None, structured=True, count=RECOMMENDATION_COUNT):
+    """Get personalized recommendations for the user using Groq LLM.
+
+    By default the model is asked for JSON matching RECOMMENDATION_PROMPT's
+    schema, with an output budget sized for ``count`` recipes; set
+    ``structured`` to False to use the original free-text prompt. Token
+    usage of every call is recorded under "recommendations", with no items
+    when the reply cannot be parsed.
+    Returns None when the request is rejected by the rate limiter or the API.
+    """
     if client is None:
         st.error("Groq client not initialized. Please check your API key.")
         return []
 
     try:
-        # Create a prompt using user details
-        prompt = f"""Based on the following user details, provide 3 personalized recipe recommendations:
-        - Favorite cuisine: {user_details['favorite_cuisine']}
-        - Dietary restrictions: {user_details['dietary_restrictions']}
-        - Preferred ingredients: {user_details['preferred_ingredients']}
-        - Ingredients to avoid: {user_details['ingredients_to_avoid']}
-        - Cooking skill: {user_details['cooking_skill']}
-        - Favorite meal: {user_details['favorite_meal']}
-        - Spice level: {user_details['spice_level']}
-        - Cooking time preference: {user_details['cooking_time_preference']}
-        
-        For each recipe, include:
-        1. Recipe name
-        2. List of ingredients
-        3. Step-by-step instructions
-        4. Estimated cooking time
-        """
+        if structured:
+            request = {
+                "messages": [{"role": "user", "content": RECOMMENDATION_PROMPT.format(
+                    count=count, profile=compact_profile(user_details)
+                )}],
+                "max_tokens": recommendation_token_budget(count),
+                "response_format": {"type": "json_object"},
+            }
+        else:
+            details = "\n        ".join(
+                f"- {field.replace('_', ' ').capitalize()}: {user_details.get(field, '')}" for field, _ in PROFILE_FIELDS
+            )
+            request = {
+                "messages": [
+                    {"role": "system", "content": "You are a helpful cooking assistant."},
+                    {"role": "user", "content": FREE_TEXT_RECOMMENDATION_PROMPT.format(count=count, details=details)}
+                ],
+                "max_tokens": 2000,
+            }
 
         # Send the prompt to the Groq LLM
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a helpful cooking assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
-
-        # Parse the response
-        response_text = completion.choices[0].message.content
-        recommendations = parse_llama_response(response_text)
+        with llm_slot(username or user_details.get('username')):
+            started = time.perf_counter()
+            completion = client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                temperature=0.7,
+                **request
+            )
+            latency = time.perf_counter() - started
+
+        # Parse the response; the tokens were spent even if the reply is unusable
+        recommendations = []
+        try:
+            response_text = completion.choices[0].message.content
+            if structured:
+                recommendations = parse_recommendations_json(response_text)
+            else:
+                recommendations = parse_llama_response(response_text)
+        finally:
+            record_usage("recommendations", completion, latency, items=len(recommendations))
         return recommendations
 
+    except RateLimitExceeded as e:
+        st.warning(f"{e} Recommendations will be available in about {e.retry_after:.0f} seconds.")
+        return None
+    except UpstreamRateLimitError:
+        st.warning("The AI service is busy right now. Recommendations will be available shortly.")
+        return None
     except Exception as e:
         st.error(f"Error getting recommendations: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def _is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def parse_recommendations_json(response_text):
+    """Validate a structured recommendation reply and convert it to recipe dicts.
+
+    Raises ValueError if the reply does not match the schema in
+    RECOMMENDATION_PROMPT. The dicts have the same shape as those from
+    parse_llama_response.
+    """
+    data = json.loads(response_text)
+    items = data.get("recipes") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError("reply has no recipes")
+    recipes = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str) or not item["name"].strip():
+            raise ValueError("recipe without a name")
+        if not _is_string_list(item.get("ingredients")) or not _is_string_list(item.get("steps")):
+            raise ValueError(f"{item['name']}: ingredients and steps must be lists of strings")
+        minutes = item.get("minutes")
+        if isinstance(minutes, bool) or not isinstance(minutes, (int, float)):
+            raise ValueError(f"{item['name']}: minutes must be a number")
+        recipes.append({
+            "name": item["name"].strip(),
+            "ingredients": "\n".join(f"- {ingredient}" for ingredient in item["ingredients"]),
+            "instructions": "\n".join(f"{i + 1}. {step}" for i, step in enumerate(item["steps"])),
+            "cooking_time": f"{int(minutes)} minutes",
+        })
+    return recipes
+
+def parse_llama_response(response_text):
+    """Parse free-text recipe recommendations into recipe dicts.
+
+    Recognises a recipe header (``Recipe 1: ...``, ``Recipe name: ...``, a
+    markdown heading or a bold line) followed by ingredient, instruction and
+    cooking time sections.
+    """
+    recipes = []
+    current = None
+    section = None
+    for raw_line in response_text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        plain = line.strip("*#").strip()
+        lowered = plain.lower()
+        header = re.match(r"^(?:\d+[.)]\s*)?(?:recipe\s*(?:name|\d+)?\s*[:.)\-]\s*)(.+)$", plain, re.IGNORECASE)
+        is_heading = line.startswith("#") or (line.startswith("**") and line.endswith("**"))
+        if lowered.rstrip(":").startswith("ingredients"):
+            section = "ingredients"
+            continue
+        if lowered.rstrip(":").startswith(("instructions", "steps", "directions", "step-by-step")):
+            section = "instructions"
+            continue
+        time_match = re.match(r"^(?:estimated\s+)?(?:cooking|total|prep)?\s*time\s*:\s*(.+)$", plain, re.IGNORECASE)
+        if time_match and current is not None:
+            current["cooking_time"] = time_match.group(1).strip("* ")
+            section = None
+            continue
+        if header or (is_heading and section != "ingredients"):
+            name = header.group(1) if header else plain
+            name = re.sub(r"^(?:\d+[.)]\s*)?(?:name\s*:\s*)?", "", name.strip("* "), flags=re.IGNORECASE)
+            current = {"name": name, "ingredients": [], "instructions": [], "cooking_time": ""}
+            recipes.append(current)
+            section = None
+            continue
+        if current is None or section is None:
+            continue
+        item = re.sub(r"^(?:[-*\u2022]|\d+[.)])\s*", "", line)
+        current[section].append(item)
+    for recipe in recipes:
+        recipe["ingredients"] = "\n".join(f"- {item}" for item in recipe["ingredients"])
+        recipe["instructions"] = "\n".join(f"{i + 1}. {step}" for i, step in enumerate(recipe["instructions"]))
+    return recipes
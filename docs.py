@@ -1,32 +1,38 @@
 import streamlit as st
-import plotly.graph_objects as go
+import os
+
+# Directory holding the documentation diagrams
+IMAGE_DIR = os.path.join("static", "images")
 
 def show_documentation():
     st.title("Project Documentation")
     
-    # Tabs for different sections
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "Requirements",
-        "Use Case Diagram",
-        "System Diagram",
-        "Activity Diagram",
-        "Class Diagram"
-    ])
-    
-    with tab1:
-        show_requirements()
-    
-    with tab2:
-        show_use_case_diagram()
-    
-    with tab3:
-        show_system_diagram()
-    
-    with tab4:
-        show_activity_diagram()
-    
-    with tab5:
-        show_class_diagram()
+    # Only the selected section is rendered, rather than every tab on each visit
+    section = st.radio(
+        "Section",
+        list(DOC_SECTIONS),
+        horizontal=True,
+        key="docs_section",
+        label_visibility="collapsed"
+    )
+    DOC_SECTIONS[section]()
+
+@st.cache_resource(show_spinner=False)
+def load_diagram(filename):
+    """Read a diagram image once per process, returning None if it is missing"""
+    try:
+        with open(os.path.join(IMAGE_DIR, filename), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def show_diagram(filename, caption=None):
+    """Display a cached diagram, or a placeholder when the image is missing"""
+    image = load_diagram(filename)
+    if image is None:
+        st.info(f"Diagram not available: {caption or filename}")
+        return
+    st.image(image, caption=caption, use_column_width=True)
 
 def show_requirements():
     st.header("Software Requirements Specification (SRS)")
@@ -148,7 +154,7 @@ def show_use_case_diagram():
     st.header("Use Case Diagram")
     
     # Display the use case diagram image
-    st.image("static/images/usecase_diagram.png", caption="AI-Based Recipe Recommendation System - Use Case Diagram", use_column_width=True)
+    show_diagram("usecase_diagram.png", caption="AI-Based Recipe Recommendation System - Use Case Diagram")
     
     # Add description of the use case diagram
     st.markdown("""
@@ -192,7 +198,7 @@ def show_system_diagram():
     st.header("System Architecture Diagram")
     
     # Display the system architecture diagram
-    st.image("static/images/system_diagram.png", use_column_width=True)
+    show_diagram("system_diagram.png")
     
     # Add description of the system architecture
     st.markdown("""
@@ -256,7 +262,7 @@ def show_system_diagram():
 def show_activity_diagram():
     st.header("Activity Diagram")
     # Display the activity diagram image
-    st.image("static/images/activity_diagram.png", caption="AI-Based Recipe Recommendation System - Activity Diagram", use_column_width=True)
+    show_diagram("activity_diagram.png", caption="AI-Based Recipe Recommendation System - Activity Diagram")
     
     # Add description of the activity diagram
     st.markdown("""
@@ -295,7 +301,7 @@ def show_activity_diagram():
 def show_class_diagram():
     st.header("Class Diagram")
     # Display the class diagram image
-    st.image("static/images/class_diagram.png", caption="AI-Based Recipe Recommendation System - Class Diagram", use_column_width=True)
+    show_diagram("class_diagram.png", caption="AI-Based Recipe Recommendation System - Class Diagram")
     
     # Add description of the class diagram
     st.markdown("""
@@ -362,4 +368,13 @@ def show_class_diagram():
     - Chatbot ---> Recipe (References)
     - User ---> Authentication (Validates through)
     - Recommender ---> User (Personalizes for)
-    """)
\ No newline at end of file
+    """)
+
+# Documentation sections, in display order
+DOC_SECTIONS = {
+    "Requirements": show_requirements,
+    "Use Case Diagram": show_use_case_diagram,
+    "System Diagram": show_system_diagram,
+    "Activity Diagram": show_activity_diagram,
+    "Class Diagram": show_class_diagram,
+}
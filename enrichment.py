@@ -0,0 +1,410 @@
+import streamlit as st
+import functools
+import json
+import queue
+import re
+import threading
+import time
+
+import shared_store
+from chatbot import client
+from llm_usage import record_usage
+from recipes import Recipe, get_recipe, recipe_id
+
+# Shared cache namespace holding enrichment results, keyed by recipe id
+ENRICHMENT_NAMESPACE = "recipe_enrichment"
+
+# Id prefix for LLM-written recommendations, so they never share a catalog recipe's enrichment
+LLM_RECIPE_PREFIX = "llm-"
+
+# Recipes are estimated per serving assuming this many servings
+DEFAULT_SERVINGS = 6
+
+# Below this share of recognised ingredient lines the LLM is asked instead
+MIN_LOCAL_COVERAGE = 0.5
+
+# Maximum number of recipes sent to the LLM in a single request
+LLM_BATCH_SIZE = 8
+
+# Grams per unit of measure
+UNIT_GRAMS = {
+    "cup": 240, "cups": 240,
+    "tbsp": 15, "tablespoon": 15, "tablespoons": 15,
+    "tsp": 5, "teaspoon": 5, "teaspoons": 5,
+    "oz": 28, "ounce": 28, "ounces": 28,
+    "lb": 454, "lbs": 454, "pound": 454, "pounds": 454,
+    "g": 1, "gram": 1, "grams": 1,
+    "kg": 1000,
+    "ml": 1, "l": 1000,
+}
+
+# Local ingredient-nutrient table: keyword -> (kcal, protein, carbs, fat per 100g, grams per piece)
+INGREDIENT_NUTRIENTS = {
+    "all-purpose flour": (364, 10, 76, 1, 120),
+    "flour": (364, 10, 76, 1, 120),
+    "yeast": (325, 40, 41, 8, 7),
+    "water": (0, 0, 0, 0, 240),
+    "salt": (0, 0, 0, 0, 6),
+    "sugar": (387, 0, 100, 0, 200),
+    "olive oil": (884, 0, 0, 100, 14),
+    "oil": (884, 0, 0, 100, 14),
+    "butter": (717, 1, 0, 81, 14),
+    "tomato sauce": (29, 1, 7, 0, 245),
+    "tomato": (18, 1, 4, 0, 120),
+    "mozzarella": (280, 28, 3, 17, 28),
+    "cheese": (400, 25, 1, 33, 28),
+    "basil": (23, 3, 3, 1, 2),
+    "cilantro": (23, 2, 4, 1, 2),
+    "chicken": (177, 24, 0, 9, 150),
+    "beef": (250, 26, 0, 15, 150),
+    "pork": (242, 27, 0, 14, 150),
+    "tuna": (132, 28, 0, 1, 150),
+    "salmon": (208, 20, 0, 13, 150),
+    "shrimp": (99, 24, 0, 0, 15),
+    "yogurt": (61, 4, 5, 3, 245),
+    "heavy cream": (340, 3, 3, 36, 240),
+    "cream": (340, 3, 3, 36, 240),
+    "milk": (61, 3, 5, 3, 240),
+    "ginger-garlic paste": (90, 3, 18, 1, 15),
+    "garlic": (149, 6, 33, 1, 3),
+    "ginger": (80, 2, 18, 1, 5),
+    "onion": (40, 1, 9, 0, 110),
+    "garam masala": (380, 15, 45, 15, 2),
+    "turmeric": (312, 10, 67, 3, 3),
+    "sushi rice": (130, 3, 28, 0, 185),
+    "rice": (130, 3, 28, 0, 185),
+    "pasta": (371, 13, 75, 2, 100),
+    "nori": (35, 6, 5, 0, 3),
+    "avocado": (160, 2, 9, 15, 150),
+    "cucumber": (15, 1, 4, 0, 300),
+    "soy sauce": (53, 8, 5, 0, 16),
+    "wasabi": (109, 5, 24, 1, 5),
+    "pickled ginger": (51, 0, 12, 0, 10),
+    "dark chocolate": (546, 5, 61, 31, 28),
+    "chocolate": (546, 5, 61, 31, 28),
+    "egg yolks": (322, 16, 4, 27, 17),
+    "egg yolk": (322, 16, 4, 27, 17),
+    "eggs": (143, 13, 1, 10, 50),
+    "egg": (143, 13, 1, 10, 50),
+    "vanilla extract": (288, 0, 13, 0, 4),
+    "powdered sugar": (389, 0, 100, 0, 120),
+    "beans": (127, 9, 23, 1, 170),
+    "lentils": (116, 9, 20, 0, 200),
+    "potato": (77, 2, 17, 0, 170),
+    "spinach": (23, 3, 4, 0, 30),
+    "bell pepper": (31, 1, 6, 0, 120),
+    "vegetables": (65, 3, 13, 0, 100),
+}
+
+# Keywords sorted longest first so "olive oil" wins over "oil"
+_NUTRIENT_KEYWORDS = sorted(INGREDIENT_NUTRIENTS, key=len, reverse=True)
+
+# Grams assumed for lines without a recognisable quantity (garnishes, seasonings)
+DEFAULT_GARNISH_GRAMS = 10
+
+_QUANTITY_PATTERN = re.compile(r"^\s*-?\s*(\d+(?:\s+\d+/\d+)?|\d+/\d+|\d*\.\d+)\s*([a-zA-Z]+)?")
+
+# Background worker state, shared by every session in this process
+_queue = queue.Queue()
+_store = {}
+_store_lock = threading.Lock()
+_pending = set()
+_requested = set()
+# Enriched copies of catalog records, keyed by recipe id, so reruns reuse them
+_merged = {}
+_worker = None
+_metrics = {
+    "enriched_local": 0,
+    "enriched_llm": 0,
+    "llm_batches": 0,
+    "llm_failures": 0,
+    "busy_seconds": 0.0,
+}
+
+def recipe_key(recipe):
+    """Return the key a recipe's enrichment is stored under"""
+    return recipe.id
+
+def needs_enrichment(recipe):
+    """Check whether a recipe is missing nutrition, difficulty or tags"""
+    return recipe.calories is None or not recipe.difficulty or not recipe.tags
+
+def _parse_quantity(text):
+    """Turn '2 1/4', '1/2' or '1.5' into a float"""
+    total = 0.0
+    for part in text.split():
+        if '/' in part:
+            numerator, denominator = part.split('/')
+            total += float(numerator) / float(denominator)
+        else:
+            total += float(part)
+    return total
+
+def _line_grams(line, piece_grams):
+    """Estimate the weight of an ingredient line in grams"""
+    match = _QUANTITY_PATTERN.match(line)
+    if not match:
+        return DEFAULT_GARNISH_GRAMS
+    amount = _parse_quantity(match.group(1))
+    unit = (match.group(2) or "").lower()
+    if unit in UNIT_GRAMS:
+        return amount * UNIT_GRAMS[unit]
+    return amount * piece_grams
+
+def estimate_nutrition(recipe, servings=DEFAULT_SERVINGS):
+    """Estimate per-serving nutrition from the local ingredient table.
+
+    Returns the nutrition dict and the share of ingredient lines that were
+    recognised, which decides whether the estimate can be trusted.
+    """
+    lines = recipe.ingredients
+    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
+    matched = 0
+    for line in lines:
+        lowered = line.lower()
+        keyword = next((k for k in _NUTRIENT_KEYWORDS if k in lowered), None)
+        if keyword is None:
+            continue
+        matched += 1
+        kcal, protein, carbs, fat, piece_grams = INGREDIENT_NUTRIENTS[keyword]
+        factor = _line_grams(line, piece_grams) / 100
+        totals["calories"] += kcal * factor
+        totals["protein"] += protein * factor
+        totals["carbs"] += carbs * factor
+        totals["fat"] += fat * factor
+    coverage = matched / len(lines) if lines else 0.0
+    nutrition = {name: int(round(value / servings)) for name, value in totals.items()}
+    return nutrition, coverage
+
+def estimate_difficulty(recipe):
+    """Guess a difficulty level from the number of steps and ingredients"""
+    score = len(recipe.steps) + len(recipe.ingredients) / 2
+    if score <= 7:
+        return "Easy"
+    if score <= 11:
+        return "Medium"
+    return "Hard"
+
+def estimate_tags(recipe, nutrition):
+    """Derive descriptive tags from the recipe fields and nutrition"""
+    tags = []
+    for value in (recipe.cuisine, recipe.category):
+        if value:
+            tags.append(value.lower())
+    if recipe.minutes and recipe.minutes <= 30:
+        tags.append("quick")
+    if nutrition.get("protein", 0) >= 25:
+        tags.append("high-protein")
+    if nutrition.get("calories", 0) and nutrition["calories"] <= 300:
+        tags.append("light")
+    return tags
+
+def enrich_locally(recipe):
+    """Enrich a recipe from the local table, or return None if coverage is too low"""
+    nutrition, coverage = estimate_nutrition(recipe)
+    if coverage < MIN_LOCAL_COVERAGE:
+        return None
+    nutrition = recipe.nutrition or nutrition
+    return {
+        "nutrition": nutrition,
+        "difficulty": recipe.difficulty or estimate_difficulty(recipe),
+        "tags": list(recipe.tags) or estimate_tags(recipe, nutrition),
+        "source": "local",
+    }
+
+def enrich_with_llm(recipes):
+    """Enrich a batch of recipes with a single LLM call, falling back to local estimates"""
+    results = {}
+    if client is not None and recipes:
+        listing = "\n".join(
+            f"{i + 1}. {r.name}: " + "; ".join(r.ingredients)
+            for i, r in enumerate(recipes)
+        )
+        prompt = f"""For each recipe below estimate per-serving nutrition, a difficulty and a few tags.
+        Reply with only a JSON array, one object per recipe in the same order, with keys
+        "calories", "protein", "carbs", "fat" (numbers), "difficulty" (Easy/Medium/Hard) and "tags" (list of strings).
+
+        {listing}
+        """
+        try:
+            started = time.perf_counter()
+            completion = client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[
+                    {"role": "system", "content": "You are a nutrition assistant that replies with JSON only."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.2,
+                max_tokens=120 * len(recipes)
+            )
+            record_usage("enrichment", completion, time.perf_counter() - started, items=len(recipes))
+            text = completion.choices[0].message.content
+            items = json.loads(text[text.index('['):text.rindex(']') + 1])
+            _metrics["llm_batches"] += 1
+            for recipe, item in zip(recipes, items):
+                results[recipe_key(recipe)] = {
+                    "nutrition": recipe.nutrition or {
+                        name: int(item.get(name, 0)) for name in ("calories", "protein", "carbs", "fat")
+                    },
+                    "difficulty": recipe.difficulty or item.get("difficulty", "Medium"),
+                    "tags": list(recipe.tags) or list(item.get("tags", [])),
+                    "source": "llm",
+                }
+        except Exception as e:
+            _metrics["llm_failures"] += 1
+            print(f"Error enriching recipes with LLM: {e}")
+    for recipe in recipes:
+        key = recipe_key(recipe)
+        if key not in results:
+            # Best effort: keep the partial local estimate rather than retrying forever
+            nutrition, coverage = estimate_nutrition(recipe)
+            nutrition = recipe.nutrition or (nutrition if coverage else {})
+            results[key] = {
+                "nutrition": nutrition,
+                "difficulty": recipe.difficulty or estimate_difficulty(recipe),
+                "tags": list(recipe.tags) or estimate_tags(recipe, nutrition),
+                "source": "estimate",
+            }
+    return results
+
+def _process_batch(batch):
+    """Enrich a batch of queued recipes and persist the results"""
+    started = time.perf_counter()
+    # Another app process may already have enriched some of these
+    shared = shared_store.get_many(ENRICHMENT_NAMESPACE, {recipe_key(recipe) for recipe in batch})
+    results = {}
+    for_llm = []
+    for recipe in batch:
+        if recipe_key(recipe) in shared:
+            continue
+        enriched = enrich_locally(recipe)
+        if enriched is None:
+            for_llm.append(recipe)
+        else:
+            results[recipe_key(recipe)] = enriched
+            _metrics["enriched_local"] += 1
+    for i in range(0, len(for_llm), LLM_BATCH_SIZE):
+        llm_results = enrich_with_llm(for_llm[i:i + LLM_BATCH_SIZE])
+        _metrics["enriched_llm"] += sum(1 for r in llm_results.values() if r["source"] == "llm")
+        results.update(llm_results)
+    if results:
+        shared_store.put_many(ENRICHMENT_NAMESPACE, results)
+    results.update(shared)
+    with _store_lock:
+        _store.update(results)
+        _pending.difference_update(results)
+    _metrics["busy_seconds"] += time.perf_counter() - started
+
+def _worker_loop():
+    """Drain the queue in batches for the lifetime of the process"""
+    while True:
+        batch = [_queue.get()]
+        while len(batch) < LLM_BATCH_SIZE * 4:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _process_batch(batch)
+        except Exception as e:
+            print(f"Error in enrichment worker: {e}")
+            with _store_lock:
+                _pending.difference_update(recipe_key(r) for r in batch)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+@st.cache_resource
+def start_enrichment_worker():
+    """Load persisted results and start the background worker (once per process)"""
+    global _worker
+    persisted = {key: value for key, value, _ in shared_store.items_since(ENRICHMENT_NAMESPACE, 0)}
+    with _store_lock:
+        _store.update(persisted)
+    _worker = threading.Thread(target=_worker_loop, name="recipe-enrichment", daemon=True)
+    _worker.start()
+    return _worker
+
+def get_enrichment(recipe):
+    """Return stored enrichment for a recipe, queueing it if it has never been enriched"""
+    key = recipe_key(recipe)
+    with _store_lock:
+        _requested.add(key)
+        if key in _store:
+            return _store[key]
+        if key in _pending:
+            return None
+        _pending.add(key)
+    _queue.put(recipe)
+    return None
+
+def with_enrichment(recipe):
+    """Return the recipe with any missing nutrition, difficulty or tags filled in"""
+    if not needs_enrichment(recipe):
+        return recipe
+    enriched = get_enrichment(recipe)
+    if not enriched:
+        return recipe
+    cached = _merged.get(recipe.id)
+    if cached is not None and cached[0] is recipe:
+        return cached[1]
+    changes = {}
+    if recipe.calories is None and enriched["nutrition"]:
+        changes.update(enriched["nutrition"])
+    if not recipe.difficulty:
+        changes["difficulty"] = enriched["difficulty"]
+    if not recipe.tags:
+        changes["tags"] = enriched["tags"]
+    merged = recipe.replace(**changes) if changes else recipe
+    _merged[recipe.id] = (recipe, merged)
+    return merged
+
+@functools.lru_cache(maxsize=256)
+def _recommendation_record(serialized):
+    """One shared record per distinct recommendation, so merges and rendering stay cached"""
+    data = json.loads(serialized)
+    if not data.get("id"):
+        # Written by the LLM: give it its own id rather than the catalog slug of the same name
+        data["id"] = LLM_RECIPE_PREFIX + recipe_id(data)
+        data["cooking_time"] = data.get("cooking_time") or "N/A"
+    return Recipe.from_dict(data)
+
+def enrich_recommendation(recommendation):
+    """Return a recommendation dict as a Recipe record with enrichment filled in.
+
+    Catalog recommendations resolve to the catalog record, or keep the
+    fields they were stored with, so known nutrition, difficulty and tags
+    are never re-estimated. LLM-written ones are queued under their own id.
+    """
+    record = get_recipe(recommendation["id"]) if recommendation.get("id") else None
+    if record is None:
+        record = _recommendation_record(json.dumps(recommendation, sort_keys=True))
+    return with_enrichment(record)
+
+def enrichment_version():
+    """Number of enrichment results known to this process; grows as results land.
+
+    Caches built from enriched records can include it in their key so
+    recipes that were still pending are picked up once enriched.
+    """
+    with _store_lock:
+        return len(_store)
+
+def get_enrichment_metrics():
+    """Return throughput, queue depth and cache coverage of the enrichment pipeline"""
+    with _store_lock:
+        requested = len(_requested)
+        covered = len(_requested.intersection(_store))
+        stored = len(_store)
+    enriched = _metrics["enriched_local"] + _metrics["enriched_llm"]
+    busy = _metrics["busy_seconds"]
+    return {
+        "queue_depth": _queue.qsize(),
+        "stored": stored,
+        "enriched_local": _metrics["enriched_local"],
+        "enriched_llm": _metrics["enriched_llm"],
+        "llm_batches": _metrics["llm_batches"],
+        "llm_failures": _metrics["llm_failures"],
+        "throughput_per_sec": enriched / busy if busy else 0.0,
+        "coverage": covered / requested if requested else 1.0,
+    }
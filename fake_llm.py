@@ -0,0 +1,236 @@
+"""Local stand-in for the Groq (OpenAI-compatible) chat completions API.
+
+Run it and point the app at it instead of Groq::
+
+    python fake_llm.py --port 8765 --latency lognormal --mean-ms 800
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=fake streamlit run app.py
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Canned recommendation reply, in the same shape the real model produces
+FAKE_RECOMMENDATIONS = """1. Recipe name: Vegetable Fried Rice
+Ingredients:
+- 2 cups cooked rice
+- 1 cup mixed vegetables
+- 2 tbsp soy sauce
+Instructions:
+1. Heat oil in a wok
+2. Stir-fry the vegetables
+3. Add rice and soy sauce
+Estimated cooking time: 20 minutes
+
+2. Recipe name: Chickpea Curry
+Ingredients:
+- 1 can chickpeas
+- 1 onion
+- 1 cup tomato sauce
+Instructions:
+1. Saute the onion
+2. Add chickpeas and sauce
+3. Simmer for 15 minutes
+Estimated cooking time: 25 minutes
+
+3. Recipe name: Caprese Salad
+Ingredients:
+- 2 tomatoes
+- 8 oz fresh mozzarella
+- Fresh basil leaves
+Instructions:
+1. Slice tomatoes and mozzarella
+2. Layer with basil
+3. Drizzle with olive oil
+Estimated cooking time: 10 minutes
+"""
+
+# The same recipes as a structured-output (JSON mode) reply
+FAKE_RECOMMENDATIONS_JSON = json.dumps({"recipes": [
+    {"name": "Vegetable Fried Rice", "ingredients": ["2 cups cooked rice", "1 cup mixed vegetables", "2 tbsp soy sauce"],
+     "steps": ["Heat oil in a wok", "Stir-fry the vegetables", "Add rice and soy sauce"], "minutes": 20},
+    {"name": "Chickpea Curry", "ingredients": ["1 can chickpeas", "1 onion", "1 cup tomato sauce"],
+     "steps": ["Saute the onion", "Add chickpeas and sauce", "Simmer for 15 minutes"], "minutes": 25},
+    {"name": "Caprese Salad", "ingredients": ["2 tomatoes", "8 oz fresh mozzarella", "Fresh basil leaves"],
+     "steps": ["Slice tomatoes and mozzarella", "Layer with basil", "Drizzle with olive oil"], "minutes": 10},
+]})
+
+FAKE_ANSWER = (
+    "Here is a quick tip: taste as you go, season in layers, and let the pan "
+    "get hot before adding ingredients so they sear instead of steam."
+)
+
+def sample_latency(config):
+    """Draw a response latency in seconds from the configured distribution"""
+    mean = config.mean_ms / 1000
+    if config.latency == "fixed":
+        return mean
+    if config.latency == "uniform":
+        return random.uniform(0, 2 * mean)
+    if config.latency == "exponential":
+        return random.expovariate(1 / mean) if mean else 0
+    # Lognormal with the requested mean, which gives a realistic long tail
+    if not mean:
+        return 0
+    sigma = config.sigma
+    return random.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+
+def build_reply(messages, json_mode=False):
+    """Pick a canned reply that fits the request"""
+    prompt = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+    if "recommend" in prompt.lower():
+        return FAKE_RECOMMENDATIONS_JSON if json_mode else FAKE_RECOMMENDATIONS
+    return FAKE_ANSWER
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Serves /openai/v1/chat/completions and /v1/chat/completions"""
+
+    protocol_version = "HTTP/1.1"
+    config = None
+    _window_lock = threading.Lock()
+    _window = []
+
+    def log_message(self, format, *args):
+        if self.config.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _over_rate_limit(self):
+        """Apply the requests-per-minute limit, like the real quota"""
+        if not self.config.rpm:
+            return False
+        now = time.monotonic()
+        with self._window_lock:
+            self._window[:] = [t for t in self._window if now - t < 60]
+            if len(self._window) >= self.config.rpm:
+                return True
+            self._window.append(now)
+        return False
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self._over_rate_limit() or random.random() < self.config.rate_limit_rate:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                {"retry-after": "1"}
+            )
+            return
+        time.sleep(sample_latency(self.config))
+        if random.random() < self.config.error_rate:
+            self._send_json(500, {"error": {"message": "Injected server error", "type": "internal_server_error"}})
+            return
+
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        content = build_reply(request.get("messages", []), json_mode)
+        max_tokens = request.get("max_tokens")
+        words = content.split(" ")
+        if max_tokens and len(words) > max_tokens:
+            content = " ".join(words[:max_tokens])
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+        completion_tokens = len(content.split())
+        if self.config.ms_per_token and not request.get("stream"):
+            # Generation time grows with the reply, as it does for a real model
+            time.sleep(completion_tokens * self.config.ms_per_token / 1000)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = request.get("model", "fake-model")
+
+        if request.get("stream"):
+            self._stream(completion_id, created, model, content)
+            return
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _stream(self, completion_id, created, model, content):
+        """Send the reply as server-sent events, one word per chunk"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": "stop" if i == len(words) - 1 else None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if self.config.stream_delay_ms:
+                time.sleep(self.config.stream_delay_ms / 1000)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+def build_parser():
+    """Command line options for the fake server"""
+    parser = argparse.ArgumentParser(description="Fake Groq/OpenAI chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "exponential", "lognormal"], default="lognormal")
+    parser.add_argument("--mean-ms", type=float, default=800, help="Mean response latency in milliseconds")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Spread of the lognormal latency distribution")
+    parser.add_argument("--stream-delay-ms", type=float, default=20, help="Delay between streamed chunks")
+    parser.add_argument("--ms-per-token", type=float, default=0, help="Extra latency per completion token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with HTTP 429")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before returning 429 (0 = unlimited)")
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+def start_fake_server(config):
+    """Start the fake server on a background thread and return it"""
+    handler = type("ConfiguredFakeLLMHandler", (FakeLLMHandler,), {"config": config, "_window": []})
+    server = ThreadingHTTPServer((config.host, config.port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    config = build_parser().parse_args()
+    server = start_fake_server(config)
+    print(f"Fake LLM listening on http://{config.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,287 @@
+"""Ingredient normalization: canonical vocabulary, synonyms and typo-tolerant lookup.
+
+User input ("tomatos", "capsicum") and catalog ingredient lines
+("2 1/4 cups all-purpose flour") resolve to canonical ingredient ids, which
+are the canonical names below. Exact and synonym matches are dictionary
+lookups; misspellings are found with BK-trees over the vocabulary, one per
+first letter, and results are cached, so resolving is cheap enough for
+every rerun.
+"""
+import functools
+import re
+
+# Canonical ingredients and the other names people and recipes use for them
+INGREDIENT_SYNONYMS = {
+    "all-purpose flour": ["plain flour", "ap flour", "maida"],
+    "flour": ["wheat flour"],
+    "yeast": ["active dry yeast", "instant yeast", "dry yeast"],
+    "water": ["warm water"],
+    "salt": ["sea salt", "kosher salt", "table salt"],
+    "sugar": ["white sugar", "granulated sugar", "caster sugar"],
+    "brown sugar": [],
+    "powdered sugar": ["icing sugar", "confectioners sugar"],
+    "olive oil": ["extra virgin olive oil", "evoo"],
+    "oil": ["vegetable oil", "cooking oil", "canola oil", "sunflower oil"],
+    "butter": ["unsalted butter", "salted butter"],
+    "ghee": ["clarified butter"],
+    "tomato": ["tomatoes", "cherry tomato", "roma tomato"],
+    "tomato sauce": ["marinara", "passata", "tomato puree"],
+    "mozzarella": ["fresh mozzarella", "mozzarella cheese"],
+    "cheese": ["cheddar", "parmesan", "cheddar cheese", "parmesan cheese"],
+    "paneer": ["indian cottage cheese"],
+    "basil": ["basil leaves", "fresh basil", "sweet basil"],
+    "cilantro": ["coriander leaves", "fresh coriander", "chinese parsley"],
+    "parsley": [],
+    "chicken": ["chicken breast", "chicken thighs", "boneless chicken"],
+    "beef": ["ground beef", "minced beef", "steak"],
+    "pork": ["bacon", "ham", "pork belly"],
+    "lamb": ["mutton"],
+    "tuna": ["sushi-grade tuna"],
+    "salmon": ["smoked salmon"],
+    "shrimp": ["prawn", "prawns"],
+    "crab": ["crab meat", "imitation crab"],
+    "yogurt": ["yoghurt", "curd", "greek yogurt"],
+    "heavy cream": ["double cream", "whipping cream"],
+    "cream": ["single cream", "light cream"],
+    "milk": ["whole milk"],
+    "ginger-garlic paste": ["ginger garlic paste"],
+    "garlic": ["garlic cloves", "minced garlic"],
+    "ginger": ["fresh ginger", "ginger root"],
+    "onion": ["onions", "red onion", "yellow onion", "white onion"],
+    "scallion": ["green onion", "spring onion"],
+    "garam masala": [],
+    "turmeric": ["haldi", "turmeric powder"],
+    "chili powder": ["red chili powder", "chilli powder", "cayenne"],
+    "cumin": ["jeera", "cumin seeds"],
+    "sushi rice": [],
+    "rice": ["white rice", "basmati rice", "jasmine rice"],
+    "pasta": ["spaghetti", "penne", "fusilli", "macaroni"],
+    "nori": ["seaweed", "nori sheets"],
+    "avocado": [],
+    "cucumber": [],
+    "soy sauce": ["soya sauce", "shoyu", "tamari"],
+    "wasabi": [],
+    "pickled ginger": ["gari"],
+    "dark chocolate": ["bittersweet chocolate", "semisweet chocolate"],
+    "chocolate": ["milk chocolate", "chocolate chips"],
+    "egg yolk": ["yolk"],
+    "egg": ["eggs", "whole egg"],
+    "vanilla extract": ["vanilla", "vanilla essence"],
+    "beans": ["kidney beans", "black beans", "rajma"],
+    "chickpeas": ["garbanzo beans", "garbanzos", "chana"],
+    "lentils": ["dal", "dhal", "masoor dal"],
+    "potato": ["potatoes", "aloo"],
+    "spinach": ["palak", "baby spinach"],
+    "bell pepper": ["capsicum", "sweet pepper", "red pepper", "green pepper"],
+    "chili": ["chilli", "chile", "green chili", "jalapeno"],
+    "eggplant": ["aubergine", "brinjal"],
+    "zucchini": ["courgette"],
+    "mushroom": ["button mushroom", "shiitake"],
+    "carrot": [],
+    "peas": ["green peas", "matar"],
+    "corn": ["sweetcorn", "maize"],
+    "lemon": ["lemon juice", "lime", "lime juice"],
+    "vegetables": ["mixed vegetables", "veggies"],
+    "almonds": ["almond"],
+    "cashews": ["cashew", "cashew nuts"],
+    "peanuts": ["peanut", "groundnut", "groundnuts", "peanut butter"],
+    "walnuts": ["walnut"],
+    "pistachios": ["pistachio"],
+    "coconut": ["coconut milk", "desiccated coconut"],
+    "tofu": ["bean curd"],
+}
+
+# Umbrella terms users avoid or prefer, and the ingredients they cover
+INGREDIENT_GROUPS = {
+    "nuts": ["almonds", "cashews", "peanuts", "walnuts", "pistachios"],
+    "shellfish": ["shrimp", "crab"],
+    "seafood": ["shrimp", "crab", "tuna", "salmon"],
+    "dairy": ["butter", "ghee", "mozzarella", "cheese", "paneer", "yogurt", "heavy cream", "cream", "milk"],
+    "meat": ["chicken", "beef", "pork", "lamb"],
+    "eggs": ["egg", "egg yolk"],
+    "gluten": ["all-purpose flour", "flour", "pasta", "soy sauce"],
+}
+
+# Quantities, units and preparation words stripped from catalog lines
+_QUANTITY = re.compile(r"^[\d\s/.\-½¼¾]+")
+_UNITS = {
+    "cup", "cups", "tbsp", "tablespoon", "tablespoons", "tsp", "teaspoon", "teaspoons",
+    "oz", "ounce", "ounces", "lb", "lbs", "pound", "pounds", "g", "gram", "grams", "kg",
+    "ml", "l", "can", "cans", "clove", "cloves", "pinch", "handful", "piece", "pieces", "sheet", "sheets",
+}
+_FILLER = {
+    "fresh", "chopped", "minced", "diced", "sliced", "large", "small", "medium", "of", "to", "taste",
+    "for", "serving", "finely", "thinly", "optional", "and", "or", "a", "some", "cooked", "raw",
+}
+
+# Longest phrase, in words, tried when scanning a catalog line
+MAX_PHRASE_WORDS = 4
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    # A shared prefix or suffix never changes the distance; skip it
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not b:
+        return len(a)
+    if not a:
+        return len(b)
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        left = i
+        for char_b, diagonal, above in zip(b, previous, previous[1:]):
+            cost = diagonal if char_a == char_b else diagonal + 1
+            if above + 1 < cost:
+                cost = above + 1
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            left = cost
+        previous = current
+    return previous[-1]
+
+class BKTree:
+    """Burkhard-Keller tree: finds every word within an edit distance of a query"""
+
+    def __init__(self, words=()):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """Return (distance, word) pairs within max_distance, closest first"""
+        if self.root is None:
+            return []
+        matches = []
+        stack = [self.root]
+        while stack:
+            candidate, children = stack.pop()
+            distance = edit_distance(word, candidate)
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+            # Triangle inequality: only these subtrees can hold matches
+            for child_distance in range(distance - max_distance, distance + max_distance + 1):
+                child = children.get(child_distance)
+                if child is not None:
+                    stack.append(child)
+        return sorted(matches)
+
+def _singular(word):
+    """Crude plural folding, applied to vocabulary and input alike"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith("oes"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def normalize_term(text):
+    """Lowercase, drop punctuation and fold plurals: 'Tomatoes!' -> 'tomato'"""
+    words = re.findall(r"[a-z]+(?:-[a-z]+)*", str(text).lower())
+    return " ".join(_singular(word) for word in words)
+
+def _build_vocabulary():
+    """Map every normalized name and synonym to its canonical id"""
+    vocabulary = {}
+    for canonical, synonyms in INGREDIENT_SYNONYMS.items():
+        for name in [canonical, *synonyms]:
+            vocabulary.setdefault(normalize_term(name), canonical)
+    for group in INGREDIENT_GROUPS:
+        vocabulary.setdefault(normalize_term(group), group)
+    return vocabulary
+
+_VOCABULARY = _build_vocabulary()
+# Typos must keep the first letter, so each letter gets its own, much smaller tree
+_TREES = {}
+for _name in _VOCABULARY:
+    _TREES.setdefault(_name[0], BKTree()).add(_name)
+_GROUPS_OF = {}
+for _group, _members in INGREDIENT_GROUPS.items():
+    for _member in _members:
+        _GROUPS_OF.setdefault(_member, []).append(_group)
+
+def _max_typos(term):
+    """Edit distance tolerated for a term of this length"""
+    # Short words are one edit away from other real ingredients (beet, beef)
+    if len(term) <= 5:
+        return 0
+    if len(term) <= 7:
+        return 1
+    return 2
+
+@functools.lru_cache(maxsize=8192)
+def resolve_ingredient(text):
+    """Resolve one user-typed ingredient to its canonical id, or None"""
+    term = normalize_term(text)
+    if not term:
+        return None
+    if term in _VOCABULARY:
+        return _VOCABULARY[term]
+    # Typos rarely hit the first letter, while different ingredients often differ there
+    tree = _TREES.get(term[0])
+    matches = tree.search(term, _max_typos(term)) if tree else []
+    if matches:
+        return _VOCABULARY[matches[0][1]]
+    return None
+
+def _line_words(line):
+    """Words of a catalog ingredient line without quantity, units and filler"""
+    words = normalize_term(_QUANTITY.sub("", line.lower())).split()
+    return [word for word in words if word not in _UNITS and word not in _FILLER]
+
+@functools.lru_cache(maxsize=8192)
+def resolve_line(line):
+    """Canonical ids mentioned in one catalog ingredient line, longest phrases first"""
+    words = _line_words(line)
+    found = set()
+    i = 0
+    while i < len(words):
+        for size in range(min(MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            phrase = " ".join(words[i:i + size])
+            if phrase in _VOCABULARY:
+                found.add(_VOCABULARY[phrase])
+                i += size
+                break
+        else:
+            i += 1
+    if not found and words:
+        # Curated lines rarely need it, but LLM-written ones may be misspelt
+        canonical = resolve_ingredient(" ".join(words))
+        if canonical:
+            found.add(canonical)
+    return frozenset(found)
+
+@functools.lru_cache(maxsize=4096)
+def ingredient_ids(ingredients):
+    """Canonical ids and umbrella groups for a recipe's tuple of ingredient lines"""
+    ids = set()
+    for line in ingredients:
+        ids.update(resolve_line(line))
+    for canonical in list(ids):
+        ids.update(_GROUPS_OF.get(canonical, ()))
+    return frozenset(ids)
@@ -0,0 +1,50 @@
+import threading
+from collections import defaultdict, deque
+
+# Recent calls kept per request kind
+USAGE_HISTORY = 500
+
+_lock = threading.Lock()
+_calls = defaultdict(lambda: deque(maxlen=USAGE_HISTORY))
+
+def record_usage(kind, completion, latency, items=1):
+    """Record the token usage and latency of one completion.
+
+    ``items`` is how many results the call produced (e.g. recipes), so costs
+    can be compared per recommendation rather than per call.
+    """
+    usage = getattr(completion, "usage", None)
+    entry = {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", None) or 0,
+        "latency": latency,
+        "items": items,
+    }
+    with _lock:
+        _calls[kind].append(entry)
+    return entry
+
+def get_usage_stats():
+    """Return average tokens and latency per call and per item, by request kind"""
+    with _lock:
+        snapshot = {kind: list(calls) for kind, calls in _calls.items()}
+    stats = {}
+    for kind, calls in snapshot.items():
+        items = sum(call["items"] for call in calls) or 1
+        prompt_tokens = sum(call["prompt_tokens"] for call in calls)
+        completion_tokens = sum(call["completion_tokens"] for call in calls)
+        latency = sum(call["latency"] for call in calls)
+        stats[kind] = {
+            "calls": len(calls),
+            "prompt_tokens_per_call": prompt_tokens / len(calls),
+            "completion_tokens_per_call": completion_tokens / len(calls),
+            "tokens_per_item": (prompt_tokens + completion_tokens) / items,
+            "latency_per_call": latency / len(calls),
+            "latency_per_item": latency / items,
+        }
+    return stats
+
+def clear_usage():
+    """Forget all recorded calls"""
+    with _lock:
+        _calls.clear()
@@ -0,0 +1,180 @@
+"""Load-test the chat and recommendation paths without hitting Groq.
+
+Simulates concurrent Streamlit sessions calling get_chatbot_response and
+get_user_recommendations, by default against an in-process fake_llm server::
+
+    python loadtest.py --sessions 50 --duration 30 --mean-ms 600
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+import fake_llm
+
+# Questions sampled by simulated chat sessions
+CHAT_QUESTIONS = [
+    "What can I use instead of buttermilk?",
+    "How do I keep pasta from sticking?",
+    "How long should I rest a steak?",
+    "What spices go well with roasted carrots?",
+    "How do I make a roux?",
+    "Can I freeze cooked rice?",
+    "Why did my bread not rise?",
+    "What is a good vegan substitute for eggs in baking?",
+]
+
+# Profile used for simulated recommendation requests
+SAMPLE_PROFILE = {
+    "favorite_cuisine": "Indian",
+    "dietary_restrictions": "Vegetarian",
+    "preferred_ingredients": "paneer, spinach, rice",
+    "ingredients_to_avoid": "nuts",
+    "cooking_skill": "Intermediate",
+    "favorite_meal": "Dinner",
+    "spice_level": "Medium",
+    "cooking_time_preference": "Moderate (20-40 mins)",
+}
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def run_session(session_id, args, deadline, results, results_lock):
+    """Drive one simulated user session until the deadline"""
+    from chatbot import initialize_chatbot, get_chatbot_response, get_user_recommendations
+
+    username = f"loadtest-{session_id}"
+    chatbot_state = initialize_chatbot()
+    turns = 0
+    while time.monotonic() < deadline:
+        if random.random() < args.recommend_share:
+            operation = "recommend"
+            started = time.perf_counter()
+            recommendations = get_user_recommendations(
+                dict(SAMPLE_PROFILE, username=username), structured=not args.free_text_recommendations
+            )
+            elapsed = time.perf_counter() - started
+            if recommendations is None:
+                outcome = "rate_limited"
+            elif recommendations:
+                outcome = "ok"
+            else:
+                outcome = "error"
+        else:
+            operation = "chat"
+            if turns >= args.turns_per_conversation:
+                chatbot_state = initialize_chatbot()
+                turns = 0
+            started = time.perf_counter()
+            response = get_chatbot_response(
+                random.choice(CHAT_QUESTIONS), chatbot_state,
+                use_cache=args.use_cache, username=username
+            )
+            elapsed = time.perf_counter() - started
+            turns += 1
+            if response is None:
+                outcome = "rate_limited"
+            elif response.startswith("I apologize"):
+                outcome = "error"
+            else:
+                outcome = "ok"
+        with results_lock:
+            results.append((operation, outcome, elapsed))
+        if args.think_ms:
+            time.sleep(random.expovariate(1000 / args.think_ms))
+
+def summarize(results, wall_seconds):
+    """Aggregate throughput, tail latency and error rates per operation"""
+    summary = {}
+    for operation in sorted({r[0] for r in results}):
+        rows = [r for r in results if r[0] == operation]
+        latencies = [r[2] * 1000 for r in rows if r[1] == "ok"]
+        summary[operation] = {
+            "requests": len(rows),
+            "throughput_per_sec": len(rows) / wall_seconds,
+            "ok": len(latencies),
+            "error_rate": sum(1 for r in rows if r[1] == "error") / len(rows),
+            "rate_limited_rate": sum(1 for r in rows if r[1] == "rate_limited") / len(rows),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": max(latencies, default=0.0),
+        }
+    return summary
+
+def build_parser():
+    """Command line options for the load test, including the fake server's"""
+    parser = fake_llm.build_parser()
+    parser.description = "Load-test the chatbot and recommendation paths"
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent simulated sessions")
+    parser.add_argument("--duration", type=float, default=30, help="Test duration in seconds")
+    parser.add_argument("--recommend-share", type=float, default=0.2, help="Share of requests that ask for recommendations")
+    parser.add_argument("--turns-per-conversation", type=int, default=3, help="Chat turns before a session starts a new conversation")
+    parser.add_argument("--think-ms", type=float, default=500, help="Mean pause between a session's requests")
+    parser.add_argument("--use-cache", action="store_true", help="Let first-turn questions hit the semantic response cache")
+    parser.add_argument("--no-user-limits", action="store_true", help="Disable per-user token buckets")
+    parser.add_argument("--free-text-recommendations", action="store_true", help="Use the free-text prompt instead of JSON mode")
+    parser.add_argument("--external", action="store_true", help="Use GROQ_BASE_URL as is instead of starting a fake server")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    return parser
+
+def main():
+    args = build_parser().parse_args()
+    if not args.external:
+        args.port = 0
+        server = fake_llm.start_fake_server(args)
+        os.environ["GROQ_BASE_URL"] = f"http://{args.host}:{server.server_port}"
+        os.environ.setdefault("GROQ_API_KEY", "fake")
+
+    try:
+        from streamlit.logger import set_log_level
+        set_log_level("error")
+    except ImportError:
+        pass
+    import rate_limit
+    from llm_usage import get_usage_stats
+    if args.no_user_limits:
+        rate_limit.USER_BUCKET_CAPACITY = float("inf")
+
+    results = []
+    results_lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + args.duration
+    sessions = [
+        threading.Thread(target=run_session, args=(i, args, deadline, results, results_lock), daemon=True)
+        for i in range(args.sessions)
+    ]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    wall_seconds = time.monotonic() - started
+
+    summary = summarize(results, wall_seconds)
+    usage = get_usage_stats()
+    if args.json:
+        print(json.dumps({"operations": summary, "token_usage": usage}, indent=2))
+        return
+    print(f"{args.sessions} sessions, {wall_seconds:.1f}s")
+    for operation, stats in summary.items():
+        print(
+            f"{operation:>10}: {stats['requests']} requests, {stats['throughput_per_sec']:.1f} req/s, "
+            f"p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms, p99 {stats['p99_ms']:.0f} ms, "
+            f"errors {stats['error_rate']:.1%}, rate limited {stats['rate_limited_rate']:.1%}"
+        )
+    for kind, stats in usage.items():
+        print(
+            f"{kind:>16} tokens: {stats['prompt_tokens_per_call']:.0f} prompt + "
+            f"{stats['completion_tokens_per_call']:.0f} completion per call, "
+            f"{stats['tokens_per_item']:.0f} per item, {stats['latency_per_item'] * 1000:.0f} ms per item"
+        )
+
+if __name__ == "__main__":
+    main()
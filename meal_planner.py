@@ -0,0 +1,178 @@
+import streamlit as st
+import bisect
+from datetime import date, timedelta
+
+from enrichment import enrichment_version, with_enrichment
+from recipes import FAMOUS_RECIPES
+
+# Candidates considered around the ideal calorie count for each meal slot
+SEARCH_WINDOW = 150
+
+# How strongly a protein shortfall counts against a meal, relative to calories
+PROTEIN_WEIGHT = 1.5
+
+# Passes of the swap-improvement step after the greedy fill
+IMPROVEMENT_PASSES = 2
+
+def build_candidate_pool(recipes, profile=None):
+    """Precompute sorted nutrition vectors for the recipes a user may eat.
+
+    Recipes without nutrition or violating the profile's hard constraints
+    (avoided ingredients, dietary restrictions) are dropped. The pool is sorted
+    by calories so each meal slot can binary-search its neighbourhood.
+    """
+    from precompute import score_recipe
+
+    rows = []
+    for recipe in recipes:
+        if not recipe.calories:
+            continue
+        preference = 0
+        if profile is not None:
+            score = score_recipe(recipe, profile)
+            if score is None:
+                continue
+            preference = score
+        rows.append((recipe.calories, recipe.protein or 0, recipe.minutes, preference, recipe))
+    rows.sort(key=lambda row: row[0])
+    return {
+        "calories": [row[0] for row in rows],
+        "protein": [row[1] for row in rows],
+        "minutes": [row[2] for row in rows],
+        "preference": [row[3] for row in rows],
+        "recipes": [row[4] for row in rows],
+    }
+
+def get_candidate_pool(version, profile):
+    """Candidate pool for a profile, rebuilt when the catalog or enrichment results change"""
+    # Recipes still pending enrichment have no nutrition yet; they join once it lands
+    return _cached_candidate_pool(version, enrichment_version(), profile)
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _cached_candidate_pool(version, enriched, profile):
+    return build_candidate_pool([with_enrichment(recipe) for recipe in FAMOUS_RECIPES], profile)
+
+def _meal_cost(pool, i, target_calories, target_protein):
+    """Cost of using candidate i for a slot; lower is better"""
+    cost = abs(pool["calories"][i] - target_calories) / target_calories
+    if target_protein > 0:
+        cost += PROTEIN_WEIGHT * max(0.0, target_protein - pool["protein"][i]) / target_protein
+    return cost - 0.02 * pool["preference"][i]
+
+def _best_candidate(pool, target_calories, target_protein, max_minutes, used):
+    """Find the cheapest usable candidate near the target calories"""
+    calories = pool["calories"]
+    minutes = pool["minutes"]
+    centre = bisect.bisect_left(calories, target_calories)
+    low, high = centre - 1, centre
+    best, best_cost, checked = None, None, 0
+    # Walk outwards from the target until enough usable candidates were scored
+    while (low >= 0 or high < len(calories)) and checked < SEARCH_WINDOW:
+        for i in (low, high):
+            if i < 0 or i >= len(calories) or i in used or minutes[i] > max_minutes:
+                continue
+            checked += 1
+            cost = _meal_cost(pool, i, target_calories, target_protein)
+            if best_cost is None or cost < best_cost:
+                best, best_cost = i, cost
+        low -= 1
+        high += 1
+    return best
+
+def _day_cost(pool, meals, daily_calories, daily_protein):
+    """How far a day's meals are from the daily targets"""
+    calories = sum(pool["calories"][i] for i in meals)
+    protein = sum(pool["protein"][i] for i in meals)
+    cost = abs(calories - daily_calories) / daily_calories
+    if daily_protein:
+        cost += PROTEIN_WEIGHT * max(0.0, daily_protein - protein) / daily_protein
+    return cost
+
+def plan_week(pool, daily_calories, daily_protein=0, max_minutes_per_day=None,
+              meals_per_day=3, days=7, allow_repeats=False, start_date=None):
+    """Build a meal plan that tracks calorie/protein targets under a time budget.
+
+    A greedy pass fills each slot with the candidate closest to the remaining
+    per-meal targets, then a swap pass replaces meals where that brings the
+    day closer to its targets. Slots stay empty when nothing fits.
+    """
+    start_date = start_date or date.today()
+    max_minutes_per_day = max_minutes_per_day or float("inf")
+    quickest = min(pool["minutes"], default=0)
+    used = set()
+    plan = []
+    for day in range(days):
+        meals = []
+        remaining_calories = daily_calories
+        remaining_protein = daily_protein
+        remaining_minutes = max_minutes_per_day
+        for slot in range(meals_per_day):
+            slots_left = meals_per_day - slot
+            # Leave enough time for the quickest recipe in each later slot
+            choice = _best_candidate(
+                pool,
+                max(remaining_calories / slots_left, 1),
+                max(remaining_protein / slots_left, 0),
+                remaining_minutes - quickest * (slots_left - 1),
+                used if not allow_repeats else set(meals)
+            )
+            if choice is None:
+                continue
+            meals.append(choice)
+            used.add(choice)
+            remaining_calories -= pool["calories"][choice]
+            remaining_protein -= pool["protein"][choice]
+            remaining_minutes -= pool["minutes"][choice]
+        plan.append(meals)
+
+    for _ in range(IMPROVEMENT_PASSES):
+        for meals in plan:
+            for position, current in enumerate(meals):
+                others = meals[:position] + meals[position + 1:]
+                other_calories = sum(pool["calories"][i] for i in others)
+                other_protein = sum(pool["protein"][i] for i in others)
+                other_minutes = sum(pool["minutes"][i] for i in others)
+                excluded = (used - {current}) if not allow_repeats else set(others)
+                candidate = _best_candidate(
+                    pool,
+                    max(daily_calories - other_calories, 1),
+                    max(daily_protein - other_protein, 0),
+                    max_minutes_per_day - other_minutes,
+                    excluded
+                )
+                if candidate is None or candidate == current:
+                    continue
+                swapped = others + [candidate]
+                if _day_cost(pool, swapped, daily_calories, daily_protein) < _day_cost(pool, meals, daily_calories, daily_protein):
+                    meals[position] = candidate
+                    used.discard(current)
+                    used.add(candidate)
+
+    return [
+        {
+            "date": (start_date + timedelta(days=day)).strftime('%Y-%m-%d'),
+            "meals": [pool["recipes"][i] for i in meals],
+            "calories": sum(pool["calories"][i] for i in meals),
+            "protein": sum(pool["protein"][i] for i in meals),
+            "minutes": sum(pool["minutes"][i] for i in meals),
+        }
+        for day, meals in enumerate(plan)
+    ]
+
+def plan_quality(plan, daily_calories, daily_protein=0, max_minutes_per_day=None):
+    """Summarize how closely a plan meets its targets"""
+    if not plan:
+        return {"calorie_error": 0.0, "protein_shortfall": 0.0, "days_over_time": 0, "meals": 0}
+    calorie_error = sum(abs(day["calories"] - daily_calories) / daily_calories for day in plan) / len(plan)
+    protein_shortfall = 0.0
+    if daily_protein:
+        protein_shortfall = sum(max(0, daily_protein - day["protein"]) / daily_protein for day in plan) / len(plan)
+    days_over_time = 0
+    if max_minutes_per_day:
+        days_over_time = sum(1 for day in plan if day["minutes"] > max_minutes_per_day)
+    return {
+        "calorie_error": calorie_error,
+        "protein_shortfall": protein_shortfall,
+        "days_over_time": days_over_time,
+        "meals": sum(len(day["meals"]) for day in plan),
+    }
@@ -0,0 +1,51 @@
+import streamlit as st
+import functools
+import threading
+from collections import Counter
+
+# Each Streamlit rerun executes on its own script thread
+_rerun_stats = threading.local()
+
+# Render a function as an independently rerunnable fragment where supported
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+def start_rerun():
+    """Reset the per-rerun cache counters; call at the top of the script"""
+    _rerun_stats.calls = Counter()
+    _rerun_stats.misses = Counter()
+
+def _counters():
+    if not hasattr(_rerun_stats, "calls"):
+        start_rerun()
+    return _rerun_stats
+
+def memoize(name, **cache_kwargs):
+    """st.cache_data that also counts calls and misses for the current rerun.
+
+    ``name`` labels the function in get_rerun_stats(); keyword arguments are
+    passed through to st.cache_data.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            _counters().misses[name] += 1
+            return func(*args, **kwargs)
+
+        cached_compute = st.cache_data(show_spinner=False, **cache_kwargs)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _counters().calls[name] += 1
+            return cached_compute(*args, **kwargs)
+
+        wrapper.clear = cached_compute.clear
+        return wrapper
+    return decorator
+
+def get_rerun_stats():
+    """Return hits and misses per memoized function for the current rerun"""
+    counters = _counters()
+    return {
+        name: {"hits": calls - counters.misses[name], "misses": counters.misses[name]}
+        for name, calls in counters.calls.items()
+    }
@@ -0,0 +1,153 @@
+import streamlit as st
+import heapq
+import math
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from shared_store import connect
+
+# Shared popularity store, updated by every app process
+POPULARITY_DB = os.path.join("data", "popularity.db")
+
+# Weight of each user action towards a recipe's popularity
+EVENT_WEIGHTS = {
+    "favorite": 3.0,
+    "shopping_list": 2.0,
+    "meal_plan": 2.0,
+}
+
+# Popularity halves every this many seconds without new activity
+HALF_LIFE_SECONDS = 24 * 60 * 60
+_DECAY_RATE = math.log(2) / HALF_LIFE_SECONDS
+
+# Seconds between flushes of buffered events to the shared store
+FLUSH_INTERVAL_SECONDS = 5
+
+# Number of trending recipes kept ready for the Featured section
+TOP_K = 20
+
+# Events are appended here without locking; deque appends and pops are atomic
+_events = deque()
+
+_top_k_lock = threading.Lock()
+_top_k_heap = []
+_top_k_scores = {}
+
+def record_event(recipe_id, kind):
+    """Buffer a popularity event; it reaches the shared store on the next flush"""
+    _events.append((recipe_id, EVENT_WEIGHTS[kind], time.time()))
+
+def _log_weight(weight, timestamp):
+    """Log of a weight scaled to the fixed epoch.
+
+    Scores are stored as log(sum(w * e^(rate * t))). Every score decays at
+    the same rate, so ranking by the stored value equals ranking by the
+    decayed score at any moment, and nothing has to be rewritten as time
+    passes.
+    """
+    return math.log(weight) + _DECAY_RATE * timestamp
+
+def _log_add(a, b):
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+def decayed_score(log_score, now=None):
+    """Convert a stored score into the decayed popularity at ``now``"""
+    now = time.time() if now is None else now
+    return math.exp(log_score - _DECAY_RATE * now)
+
+def _connect():
+    connection = connect(POPULARITY_DB)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS recipe_popularity ("
+        "recipe_id TEXT PRIMARY KEY, log_score REAL NOT NULL, events INTEGER NOT NULL DEFAULT 0)"
+    )
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_popularity_score ON recipe_popularity (log_score DESC)")
+    return connection
+
+def _update_top_k(recipe_id, log_score):
+    """Keep the K best scores in a min-heap; caller must hold the top-K lock"""
+    if recipe_id in _top_k_scores:
+        if log_score <= _top_k_scores[recipe_id]:
+            return
+        _top_k_scores[recipe_id] = log_score
+        # Scores only grow, so re-heapify the small heap in place
+        _top_k_heap[:] = [(score, rid) for rid, score in _top_k_scores.items()]
+        heapq.heapify(_top_k_heap)
+    elif len(_top_k_heap) < TOP_K:
+        _top_k_scores[recipe_id] = log_score
+        heapq.heappush(_top_k_heap, (log_score, recipe_id))
+    elif log_score > _top_k_heap[0][0]:
+        _, evicted = heapq.heapreplace(_top_k_heap, (log_score, recipe_id))
+        del _top_k_scores[evicted]
+        _top_k_scores[recipe_id] = log_score
+
+def flush_events():
+    """Aggregate buffered events and merge them into the shared store"""
+    deltas = {}
+    counts = Counter()
+    while True:
+        try:
+            recipe_id, weight, timestamp = _events.popleft()
+        except IndexError:
+            break
+        deltas[recipe_id] = _log_add(deltas.get(recipe_id), _log_weight(weight, timestamp))
+        counts[recipe_id] += 1
+
+    connection = _connect()
+    try:
+        updated = {}
+        if deltas:
+            connection.execute("BEGIN IMMEDIATE")
+            placeholders = ",".join("?" * len(deltas))
+            existing = dict(connection.execute(
+                f"SELECT recipe_id, log_score FROM recipe_popularity WHERE recipe_id IN ({placeholders})",
+                list(deltas)
+            ))
+            for recipe_id, delta in deltas.items():
+                updated[recipe_id] = _log_add(existing.get(recipe_id), delta)
+            connection.executemany(
+                "INSERT INTO recipe_popularity (recipe_id, log_score, events) VALUES (?, ?, ?) "
+                "ON CONFLICT(recipe_id) DO UPDATE SET log_score = excluded.log_score, "
+                "events = recipe_popularity.events + excluded.events",
+                [(recipe_id, score, counts[recipe_id]) for recipe_id, score in updated.items()]
+            )
+            connection.execute("COMMIT")
+        # Pick up updates flushed by other processes through the score index
+        shared_top = connection.execute(
+            "SELECT recipe_id, log_score FROM recipe_popularity ORDER BY log_score DESC LIMIT ?",
+            (TOP_K,)
+        ).fetchall()
+    finally:
+        connection.close()
+
+    with _top_k_lock:
+        for recipe_id, log_score in list(updated.items()) + shared_top:
+            _update_top_k(recipe_id, log_score)
+    return len(counts)
+
+def _flush_loop():
+    while True:
+        try:
+            flush_events()
+        except Exception as e:
+            print(f"Error flushing popularity events: {e}")
+        time.sleep(FLUSH_INTERVAL_SECONDS)
+
+@st.cache_resource
+def start_popularity_flusher():
+    """Start the periodic flush thread (once per process)"""
+    thread = threading.Thread(target=_flush_loop, name="popularity-flush", daemon=True)
+    thread.start()
+    return thread
+
+def get_trending(k=TOP_K):
+    """Return up to k (recipe_id, decayed score) pairs, most popular first"""
+    with _top_k_lock:
+        entries = list(_top_k_heap)
+    now = time.time()
+    return [(recipe_id, decayed_score(log_score, now)) for log_score, recipe_id in heapq.nlargest(k, entries)]
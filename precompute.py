@@ -0,0 +1,295 @@
+"""Precompute recommendation sets for every user profile.
+
+Run ``python precompute.py`` from cron (or let the app run it in the
+background at startup). Only profile groups that are new, changed, or whose
+results were computed against an older catalog are regenerated.
+"""
+import streamlit as st
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+
+import shared_store
+from auth import load_user_data
+from chatbot import client, parse_llama_response
+from ingredients import ingredient_ids, resolve_ingredient
+from rate_limit import RateLimitExceeded, llm_slot
+from llm_usage import record_usage
+from recipes import FAMOUS_RECIPES, catalog_version
+
+# Shared store namespaces for recommendations by profile group, and each user's group
+GROUPS_NAMESPACE = "recommendation_groups"
+USERS_NAMESPACE = "recommendation_users"
+
+# Recipes recommended to each user
+RECOMMENDATIONS_PER_USER = 3
+
+# Minimum local score for a catalog recipe to be recommended without the LLM
+MIN_LOCAL_SCORE = 3
+
+# Profile groups sent to the LLM in a single request
+LLM_GROUPS_PER_BATCH = 4
+
+# Rate limiter rejections a precompute batch waits out before it is counted as failed
+PRECOMPUTE_RATE_LIMIT_RETRIES = 10
+
+# Profiles whose ingredient sets overlap at least this much share recommendations
+NEAR_DUPLICATE_JACCARD = 0.6
+
+# Ingredient ids and groups each signup dietary restriction rules out
+DIETARY_EXCLUSIONS = {
+    "vegetarian": ("meat", "seafood"),
+    "vegan": ("meat", "seafood", "dairy", "eggs"),
+    "gluten-free": ("gluten",),
+    "dairy-free": ("dairy",),
+    "nut-free": ("nuts",),
+}
+
+# Leftover signup placeholders that are not real preferences
+_PLACEHOLDER_PREFIX = re.compile(r"^\s*e\.g\.,?\s*", re.IGNORECASE)
+
+def _split_list(value):
+    """Normalize a comma-separated preference field into a sorted tuple"""
+    if not isinstance(value, str):
+        return ()
+    value = _PLACEHOLDER_PREFIX.sub("", value)
+    items = {item.strip().lower() for item in value.split(",")}
+    return tuple(sorted(item for item in items if item and item != "none"))
+
+def _ingredient_list(value):
+    """Like _split_list, but with ingredients resolved to canonical ids where known"""
+    return tuple(sorted({resolve_ingredient(item) or item for item in _split_list(value)}))
+
+def normalize_profile(user_details):
+    """Reduce a user row to the fields that affect recommendations"""
+    def field(name):
+        value = user_details.get(name, "")
+        return value.strip() if isinstance(value, str) else ""
+    return {
+        "favorite_cuisine": field('favorite_cuisine'),
+        "dietary_restrictions": _split_list(user_details.get('dietary_restrictions')),
+        "preferred_ingredients": _ingredient_list(user_details.get('preferred_ingredients')),
+        "ingredients_to_avoid": _ingredient_list(user_details.get('ingredients_to_avoid')),
+        "cooking_skill": field('cooking_skill'),
+        "favorite_meal": field('favorite_meal'),
+        "spice_level": field('spice_level'),
+        "cooking_time_preference": field('cooking_time_preference'),
+    }
+
+def profile_signature(profile):
+    """Stable hash identifying identical normalized profiles"""
+    return hashlib.sha1(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def _jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(set(a) & set(b)) / len(set(a) | set(b))
+
+def group_profiles(user_data):
+    """Group users with identical or near-identical preference profiles.
+
+    Profiles must agree on everything except preferred ingredients, which
+    only need to overlap by NEAR_DUPLICATE_JACCARD. Returns a dict mapping
+    group signature to ``{"profile": ..., "usernames": [...]}``.
+    """
+    groups = {}
+    by_coarse_key = {}
+    for _, row in user_data.iterrows():
+        profile = normalize_profile(row)
+        coarse = dict(profile, preferred_ingredients=())
+        coarse_key = profile_signature(coarse)
+        candidates = by_coarse_key.setdefault(coarse_key, [])
+        for signature in candidates:
+            group = groups[signature]
+            if _jaccard(group["profile"]["preferred_ingredients"], profile["preferred_ingredients"]) >= NEAR_DUPLICATE_JACCARD:
+                group["usernames"].append(row['username'])
+                break
+        else:
+            signature = profile_signature(profile)
+            groups[signature] = {"profile": profile, "usernames": [row['username']]}
+            candidates.append(signature)
+    return groups
+
+def _time_budget(cooking_time_preference):
+    """Upper bound in minutes for a signup cooking time preference"""
+    if cooking_time_preference.startswith("Quick"):
+        return 20
+    if cooking_time_preference.startswith("Moderate"):
+        return 40
+    return None
+
+def score_recipe(recipe, profile):
+    """Score a catalog recipe for a profile, or None if it violates a hard constraint"""
+    ids = ingredient_ids(recipe.ingredients)
+    ingredients = "\n".join(recipe.ingredients).lower()
+
+    def has(item):
+        # Unresolved items fall back to a substring match on the raw lines
+        return item in ids or item in ingredients
+
+    if any(has(item) for item in profile["ingredients_to_avoid"]):
+        return None
+    restrictions = profile["dietary_restrictions"]
+    if ("vegetarian" in restrictions or "vegan" in restrictions) and recipe.category == "non-vegetarian":
+        return None
+    if any(excluded in ids for restriction in restrictions for excluded in DIETARY_EXCLUSIONS.get(restriction, ())):
+        return None
+    score = 0
+    if recipe.cuisine.lower() == profile["favorite_cuisine"].lower():
+        score += 3
+    score += sum(1 for item in profile["preferred_ingredients"] if has(item))
+    budget = _time_budget(profile["cooking_time_preference"])
+    if budget is None or (recipe.minutes and recipe.minutes <= budget):
+        score += 1
+    if profile["cooking_skill"] == "Beginner" and recipe.difficulty == "Hard":
+        score -= 2
+    return score
+
+def recommend_locally(profile, recipes=FAMOUS_RECIPES):
+    """Pick recommendations from the catalog as stored dicts, or None if too few recipes fit well"""
+    scored = []
+    for recipe in recipes:
+        score = score_recipe(recipe, profile)
+        if score is not None and score >= MIN_LOCAL_SCORE:
+            scored.append((score, recipe))
+    if len(scored) < RECOMMENDATIONS_PER_USER:
+        return None
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [recipe.to_dict() for _, recipe in scored[:RECOMMENDATIONS_PER_USER]]
+
+def recommend_with_llm(profiles):
+    """Ask the LLM for recommendations for several profiles in one request"""
+    if client is None or not profiles:
+        return [None] * len(profiles)
+    sections = []
+    for i, profile in enumerate(profiles):
+        details = "; ".join(
+            f"{name.replace('_', ' ')}: {', '.join(value) if isinstance(value, tuple) else value}"
+            for name, value in profile.items()
+        )
+        sections.append(f"Profile {i + 1}: {details}")
+    prompt = f"""For each user profile below, provide {RECOMMENDATIONS_PER_USER} personalized recipe recommendations.
+    Start each profile's answer with a line "=== Profile N ===".
+    For each recipe, include the recipe name, list of ingredients, step-by-step instructions and estimated cooking time.
+
+    """ + "\n".join(sections)
+    try:
+        # The job shares the limiter with chat users, so pace batches to it instead of failing them
+        for attempt in range(PRECOMPUTE_RATE_LIMIT_RETRIES + 1):
+            try:
+                with llm_slot("precompute"):
+                    started = time.perf_counter()
+                    completion = client.chat.completions.create(
+                        model="llama-3.3-70b-versatile",
+                        messages=[
+                            {"role": "system", "content": "You are a helpful cooking assistant."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=0.7,
+                        max_tokens=700 * len(profiles)
+                    )
+                    record_usage("precompute", completion, time.perf_counter() - started, items=len(profiles))
+                break
+            except RateLimitExceeded as e:
+                if attempt == PRECOMPUTE_RATE_LIMIT_RETRIES:
+                    print(f"Precompute batch still rate limited after {attempt} retries")
+                    return [None] * len(profiles)
+                time.sleep(e.retry_after)
+    except Exception as e:
+        print(f"Error precomputing recommendations: {e}")
+        return [None] * len(profiles)
+    text = completion.choices[0].message.content
+    parts = re.split(r"^\W*=+\s*Profile\s+(\d+)\s*=+\W*$", text, flags=re.IGNORECASE | re.MULTILINE)
+    results = [None] * len(profiles)
+    for number, body in zip(parts[1::2], parts[2::2]):
+        index = int(number) - 1
+        if 0 <= index < len(profiles):
+            results[index] = parse_llama_response(body)[:RECOMMENDATIONS_PER_USER] or None
+    return results
+
+def refresh_recommendations(force=False):
+    """Recompute recommendations for new or changed profile groups.
+
+    Returns counts of groups served from cache, scored locally and sent to
+    the LLM, for logging. Results go to the shared store, where anything
+    written after the job started (live recommendations, another worker's
+    run) wins over the job's older results.
+    """
+    started = time.time()
+    version = catalog_version()
+    groups = group_profiles(load_user_data())
+    existing = shared_store.get_many(GROUPS_NAMESPACE, groups)
+    stale = {
+        signature: group for signature, group in groups.items()
+        if force or existing.get(signature, {}).get("catalog_version") != version
+    }
+    counts = {"users": sum(len(g["usernames"]) for g in groups.values()), "groups": len(groups),
+              "cached": len(groups) - len(stale), "local": 0, "llm": 0, "failed": 0}
+
+    updates = {}
+    llm_pending = []
+    for signature, group in stale.items():
+        recommendations = recommend_locally(group["profile"])
+        if recommendations is None:
+            llm_pending.append(signature)
+            continue
+        updates[signature] = {"catalog_version": version, "source": "local",
+                              "updated": time.time(), "recommendations": recommendations}
+        counts["local"] += 1
+
+    for i in range(0, len(llm_pending), LLM_GROUPS_PER_BATCH):
+        batch = llm_pending[i:i + LLM_GROUPS_PER_BATCH]
+        results = recommend_with_llm([groups[signature]["profile"] for signature in batch])
+        for signature, recommendations in zip(batch, results):
+            if recommendations is None:
+                counts["failed"] += 1
+                continue
+            updates[signature] = {"catalog_version": version, "source": "llm",
+                                  "updated": time.time(), "recommendations": recommendations}
+            counts["llm"] += 1
+
+    # Groups first, so a user is never mapped to a group that is not stored yet
+    shared_store.put_many(GROUPS_NAMESPACE, updates, older_than=started)
+    shared_store.put_many(USERS_NAMESPACE, {
+        username: signature for signature, group in groups.items() for username in group["usernames"]
+    }, older_than=started)
+    referenced = {signature for _, signature, _ in shared_store.items_since(USERS_NAMESPACE, 0)}
+    unreferenced = [key for key, _, _ in shared_store.items_since(GROUPS_NAMESPACE, 0) if key not in referenced]
+    shared_store.delete_many(GROUPS_NAMESPACE, unreferenced, older_than=started)
+    return counts
+
+def get_precomputed_recommendations(username):
+    """Return the stored recommendations for a user, or None if not computed yet"""
+    signature = shared_store.get(USERS_NAMESPACE, username)
+    entry = shared_store.get(GROUPS_NAMESPACE, signature) if signature else None
+    return entry["recommendations"] if entry else None
+
+def store_live_recommendations(user_details, recommendations):
+    """Save recommendations fetched live so the user's group is served from the store"""
+    profile = normalize_profile(user_details)
+    signature = profile_signature(profile)
+    shared_store.put(GROUPS_NAMESPACE, signature, {"catalog_version": catalog_version(), "source": "llm",
+                                                   "updated": time.time(), "recommendations": recommendations})
+    shared_store.put(USERS_NAMESPACE, user_details['username'], signature)
+
+@st.cache_resource
+def start_precompute_job(profiles_modified, version):
+    """Refresh precomputed recommendations in a background thread.
+
+    Cached on the profile file's modification time and the catalog version,
+    so a refresh runs once per process and again whenever either changes.
+    """
+    thread = threading.Thread(target=refresh_recommendations, name="recommendation-precompute", daemon=True)
+    thread.start()
+    return thread
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute recipe recommendations for all users")
+    parser.add_argument("--force", action="store_true", help="Recompute every group, not just stale ones")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    counts = refresh_recommendations(force=args.force)
+    print(f"{counts} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,113 @@
+import streamlit as st
+import threading
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from auth import get_user_profile
+from chatbot import get_user_recommendations
+from precompute import get_precomputed_recommendations, store_live_recommendations
+from recipes import catalog_version, ensure_recipe_index, get_recipe_page
+from response_cache import warm_cache
+
+# Longest a page waits for a prefetch that is still running before computing it itself
+PREFETCH_WAIT_SECONDS = 3
+
+_stats_lock = threading.Lock()
+_stats = Counter()
+# Futures a page view already found still running, so each is counted as pending once
+_seen_pending = weakref.WeakSet()
+
+@st.cache_resource
+def get_prefetch_pool():
+    """Thread pool shared by every session's post-login prefetch"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+
+def _warm_catalog():
+    version = catalog_version()
+    ensure_recipe_index(version)
+    return version
+
+def _warm_search(username):
+    """Warm the home page's default results and the user's favorite cuisine"""
+    profile = get_user_profile(username)
+    version = catalog_version()
+    get_recipe_page("", "All", "All", None, 0, version)
+    cuisine = (profile or {}).get('favorite_cuisine')
+    if cuisine:
+        get_recipe_page("", cuisine, "All", None, 0, version)
+
+def _load_recommendations(username):
+    """Serve precomputed recommendations, or start the live request for new users"""
+    profile = get_user_profile(username)
+    recommendations = get_precomputed_recommendations(username)
+    if recommendations is None and profile:
+        recommendations = get_user_recommendations(profile, username)
+        if recommendations:
+            store_live_recommendations(profile, recommendations)
+    # A failed live request returns [], which is no more ready than None
+    return recommendations or None
+
+def start_prefetch(username):
+    """Kick off post-login warm-up tasks and return their futures by name.
+
+    Call right after a successful login; store the result in session state
+    and read it back with use_prefetched().
+    """
+    # Tasks never wait on each other, so a busy pool cannot deadlock
+    pool = get_prefetch_pool()
+    return {
+        "profile": pool.submit(get_user_profile, username),
+        "catalog": pool.submit(_warm_catalog),
+        "search": pool.submit(_warm_search, username),
+        "recommendations": pool.submit(_load_recommendations, username),
+        "chat_cache": pool.submit(warm_cache),
+    }
+
+def use_prefetched(futures, name, compute, wait=PREFETCH_WAIT_SECONDS):
+    """Return a prefetched result, falling back to compute() on a miss.
+
+    Each prefetched item serves only the first page view that gets it;
+    later calls compute fresh data (and are not counted). With ``wait=0``
+    the call never blocks: a prefetch still running stays queued for a
+    later view and is counted as pending once, not as a miss on every rerun.
+    """
+    if futures is None or name not in futures:
+        return compute()
+    future = futures[name]
+    if not wait and not future.done():
+        with _stats_lock:
+            if future not in _seen_pending:
+                _seen_pending.add(future)
+                _stats[(name, "pending")] += 1
+        return compute()
+    del futures[name]
+    result = None
+    hit = False
+    try:
+        result = future.result(timeout=wait or None)
+        hit = True
+    except TimeoutError:
+        pass
+    except Exception as e:
+        print(f"Prefetch of {name} failed: {e}")
+    with _stats_lock:
+        _stats[(name, "hit" if hit else "miss")] += 1
+    return result if hit else compute()
+
+def is_prefetching(futures, name):
+    """Whether a prefetch is still running and has not been used yet"""
+    return bool(futures) and name in futures and not futures[name].done()
+
+def get_prefetch_stats():
+    """Return hit, miss and still-pending counts per prefetched item"""
+    with _stats_lock:
+        names = sorted({name for name, _ in _stats})
+        return {
+            name: {
+                "hits": _stats[(name, "hit")],
+                "misses": _stats[(name, "miss")],
+                "pending": _stats[(name, "pending")],
+            }
+            for name in names
+        }
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Burst size and sustained rate of LLM requests allowed per user
+USER_BUCKET_CAPACITY = 5
+USER_REFILL_PER_SECOND = 0.2
+
+# LLM calls allowed in flight at once across every session in this process
+MAX_CONCURRENT_LLM_CALLS = 4
+
+# Waiting requests allowed in total and per user before new ones are rejected
+MAX_QUEUED_REQUESTS = 50
+MAX_QUEUED_PER_USER = 2
+
+# Longest a request waits for a slot before giving up
+MAX_QUEUE_WAIT_SECONDS = 30
+
+class RateLimitExceeded(Exception):
+    """Raised when a request is rejected by the rate limiter or the full queue"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+_lock = threading.Lock()
+_slot_freed = threading.Condition(_lock)
+_buckets = {}
+_waiting = {}
+_turn_order = deque()
+_active = 0
+_queued = 0
+_wait_stats = {}
+
+def _take_token(username, now):
+    """Take a token from the user's bucket; caller must hold the lock"""
+    tokens, updated = _buckets.get(username, (USER_BUCKET_CAPACITY, now))
+    tokens = min(USER_BUCKET_CAPACITY, tokens + (now - updated) * USER_REFILL_PER_SECOND)
+    if tokens < 1:
+        _buckets[username] = (tokens, now)
+        return (1 - tokens) / USER_REFILL_PER_SECOND
+    _buckets[username] = (tokens - 1, now)
+    return 0
+
+def _grant_next():
+    """Hand free slots to waiting users in round-robin order; caller must hold the lock"""
+    global _active, _queued
+    granted = False
+    while _active < MAX_CONCURRENT_LLM_CALLS and _turn_order:
+        username = _turn_order.popleft()
+        tickets = _waiting[username]
+        ticket = tickets.popleft()
+        if tickets:
+            _turn_order.append(username)
+        else:
+            del _waiting[username]
+        ticket["granted"] = True
+        _active += 1
+        _queued -= 1
+        granted = True
+    if granted:
+        _slot_freed.notify_all()
+
+def _record_wait(username, waited):
+    """Add a queue wait sample for a user; caller must hold the lock"""
+    stats = _wait_stats.setdefault(username, {"requests": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+    stats["requests"] += 1
+    stats["total_seconds"] += waited
+    stats["max_seconds"] = max(stats["max_seconds"], waited)
+
+def acquire_llm_slot(username):
+    """Block until the user may make an LLM call.
+
+    Raises RateLimitExceeded if the user's token bucket is empty or the
+    waiting queue is full, so the caller can tell the user to back off.
+    """
+    global _active, _queued
+    username = username or "anonymous"
+    started = time.monotonic()
+    with _lock:
+        retry_after = _take_token(username, started)
+        if retry_after:
+            raise RateLimitExceeded("You're sending requests too quickly.", retry_after)
+        if _active < MAX_CONCURRENT_LLM_CALLS and not _turn_order:
+            _active += 1
+            _record_wait(username, 0.0)
+            return
+        tickets = _waiting.get(username)
+        if _queued >= MAX_QUEUED_REQUESTS or (tickets and len(tickets) >= MAX_QUEUED_PER_USER):
+            raise RateLimitExceeded("The assistant is busy right now.", MAX_QUEUE_WAIT_SECONDS / 10)
+        ticket = {"granted": False}
+        if tickets is None:
+            tickets = _waiting[username] = deque()
+            _turn_order.append(username)
+        tickets.append(ticket)
+        _queued += 1
+        deadline = started + MAX_QUEUE_WAIT_SECONDS
+        while not ticket["granted"]:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                tickets.remove(ticket)
+                if not tickets:
+                    del _waiting[username]
+                    _turn_order.remove(username)
+                _queued -= 1
+                raise RateLimitExceeded("The assistant is busy right now.", MAX_QUEUE_WAIT_SECONDS / 10)
+            _slot_freed.wait(remaining)
+        _record_wait(username, time.monotonic() - started)
+
+def release_llm_slot():
+    """Free an LLM slot and pass it to the next waiting user"""
+    global _active
+    with _lock:
+        _active -= 1
+        _grant_next()
+
+@contextmanager
+def llm_slot(username):
+    """Hold an LLM slot for the duration of the block"""
+    acquire_llm_slot(username)
+    try:
+        yield
+    finally:
+        release_llm_slot()
+
+def get_scheduler_stats():
+    """Return queue depth, active calls and queue wait times per user"""
+    with _lock:
+        return {
+            "active": _active,
+            "queued": _queued,
+            "wait_by_user": {
+                username: {
+                    "requests": stats["requests"],
+                    "avg_wait_seconds": stats["total_seconds"] / stats["requests"],
+                    "max_wait_seconds": stats["max_seconds"],
+                }
+                for username, stats in _wait_stats.items()
+            },
+        }
@@ -0,0 +1,145 @@
+"""Read-only, memory-mapped search index over the recipe catalog.
+
+The index is written once per catalog version and mapped by every app and
+search-worker process, so the operating system shares one copy of it.
+
+Layout (little endian)::
+
+    magic "RIDX1" | uint32 header length | JSON header
+    records: count x (uint32 name offset, uint16 name length,
+                      uint16 minutes, uint8 cuisine, uint8 category)
+    names: lowercased names, newline separated
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+from array import array
+
+MAGIC = b"RIDX1"
+RECORD = struct.Struct("<IHHBB")
+
+# Worker processes keep their mapped index here
+_worker_index = None
+
+def build_recipe_index(recipes, path, version):
+    """Write the index for the catalog ``recipes`` records to ``path`` atomically"""
+    cuisines = sorted({recipe.cuisine for recipe in recipes})
+    categories = sorted({recipe.category for recipe in recipes})
+    cuisine_codes = {name: code for code, name in enumerate(cuisines)}
+    category_codes = {name: code for code, name in enumerate(categories)}
+    header = json.dumps({
+        "version": version, "count": len(recipes), "cuisines": cuisines, "categories": categories
+    }).encode("utf-8")
+
+    names = bytearray()
+    records = bytearray()
+    for recipe in recipes:
+        name = recipe.name.lower().replace("\n", " ").encode("utf-8")
+        records += RECORD.pack(
+            len(names), len(name), min(recipe.minutes, 65535),
+            cuisine_codes[recipe.cuisine], category_codes[recipe.category]
+        )
+        names += name + b"\n"
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header + records + names)
+    os.replace(tmp_path, path)
+
+def open_recipe_index(path):
+    """Map an index file read-only and return a handle for search_index"""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a recipe index: {path}")
+    header_length = struct.unpack_from("<I", buffer, len(MAGIC))[0]
+    header_start = len(MAGIC) + 4
+    header = json.loads(buffer[header_start:header_start + header_length])
+    records_start = header_start + header_length
+    names_start = records_start + header["count"] * RECORD.size
+    offsets = array("I", (
+        record[0] for record in RECORD.iter_unpack(memoryview(buffer)[records_start:names_start])
+    ))
+    return {
+        "buffer": buffer,
+        "header": header,
+        "records_start": records_start,
+        "names_start": names_start,
+        "offsets": offsets,
+    }
+
+def _time_bucket_matches(minutes, time_filter):
+    if time_filter == "Quick (< 30 mins)":
+        return minutes <= 30
+    if time_filter == "Medium (30-60 mins)":
+        return 30 < minutes <= 60
+    return minutes > 60
+
+def search_index(index, search_query="", cuisine_filter="All", time_filter="All", category=None, start=0, end=None):
+    """Return catalog positions in [start, end) matching the query and filters.
+
+    With a query, candidates come from substring hits in the slice of the
+    mapped names blob holding records [start, end), so recipes whose names
+    cannot match are never decoded. Names are
+    newline separated and queries never contain a newline, so a hit always
+    lies inside a single name.
+    """
+    header = index["header"]
+    count = header["count"]
+    end = count if end is None else min(end, count)
+    buffer = index["buffer"]
+    cuisine_code = header["cuisines"].index(cuisine_filter) if cuisine_filter in header["cuisines"] else None
+    if cuisine_filter != "All" and cuisine_code is None:
+        return []
+    category_code = None
+    if category and category != "quick-meals":
+        if category not in header["categories"]:
+            return []
+        category_code = header["categories"].index(category)
+
+    query = search_query.lower().replace("\n", " ").encode("utf-8")
+    records_start = index["records_start"]
+    if query:
+        if start >= end:
+            return []
+        candidates = []
+        names_start = index["names_start"]
+        offsets = index["offsets"]
+        # Only scan the names of records [start, end), so pool workers split the work
+        scan_start = names_start + offsets[start]
+        scan_end = names_start + offsets[end] if end < count else len(buffer)
+        position = buffer.find(query, scan_start, scan_end)
+        while position != -1:
+            record = bisect.bisect_right(offsets, position - names_start) - 1
+            if not candidates or candidates[-1] != record:
+                candidates.append(record)
+            position = buffer.find(query, position + 1, scan_end)
+        rows = ((record, RECORD.unpack_from(buffer, records_start + record * RECORD.size)) for record in candidates)
+    else:
+        view = memoryview(buffer)[records_start + start * RECORD.size:records_start + end * RECORD.size]
+        rows = enumerate(RECORD.iter_unpack(view), start)
+
+    quick_only = category == "quick-meals"
+    matches = []
+    for record, (_, _, minutes, cuisine, recipe_category) in rows:
+        if cuisine_code is not None and cuisine != cuisine_code:
+            continue
+        if time_filter != "All" and not _time_bucket_matches(minutes, time_filter):
+            continue
+        if category_code is not None and recipe_category != category_code:
+            continue
+        if quick_only and minutes > 30:
+            continue
+        matches.append(record)
+    return matches
+
+def init_search_worker(path):
+    """Process pool initializer: map the index once per worker"""
+    global _worker_index
+    _worker_index = open_recipe_index(path)
+
+def search_in_worker(*args):
+    """Run search_index against the worker's mapped index"""
+    return search_index(_worker_index, *args)
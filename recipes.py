@@ -0,0 +1,386 @@
+import streamlit as st
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from memo import memoize
+from recipe_index import build_recipe_index, init_search_worker, search_in_worker
+from utils import ensure_data_directory
+
+# Number of recipe cards rendered per page on the home screen
+RECIPES_PER_PAGE = 10
+
+# Catalogs at least this large are filtered by the search process pool
+PARALLEL_SEARCH_THRESHOLD = 50_000
+
+# Processes in the search pool
+SEARCH_WORKERS = int(os.getenv("RECIPE_SEARCH_WORKERS", os.cpu_count() or 1))
+
+# Raw catalog data; the app works with the Recipe records built from it below
+_CATALOG_DATA = [
+    {
+        "id": "classic-margherita-pizza",
+        "name": "Classic Margherita Pizza",
+        "cuisine": "Italian",
+        "category": "vegetarian",
+        "rating": 4.8,
+        "difficulty": "Medium",
+        "ingredients": """
+        - 2 1/4 cups all-purpose flour
+        - 1 tsp active dry yeast
+        - 1 cup warm water
+        - 1 tsp salt
+        - 1 tbsp olive oil
+        - 1 cup tomato sauce
+        - 8 oz fresh mozzarella
+        - Fresh basil leaves
+        - Extra virgin olive oil
+        """,
+        "instructions": """
+        1. Mix flour, yeast, and salt in a bowl
+        2. Add warm water and olive oil, knead for 10 minutes
+        3. Let dough rise for 2 hours
+        4. Roll out dough and add toppings
+        5. Bake at 450°F for 15-20 minutes
+        """,
+        "cooking_time": "2 hours 30 minutes",
+        "nutrition": {
+            "calories": 250,
+            "protein": 10,
+            "carbs": 30,
+            "fat": 8
+        }
+    },
+    {
+        "id": "butter-chicken",
+        "name": "Butter Chicken",
+        "cuisine": "Indian",
+        "category": "non-vegetarian",
+        "rating": 4.9,
+        "difficulty": "Medium",
+        "ingredients": """
+        - 2 lbs chicken thighs
+        - 1 cup yogurt
+        - 2 tbsp ginger-garlic paste
+        - 2 tsp garam masala
+        - 1 tsp turmeric
+        - 2 cups tomato sauce
+        - 1 cup heavy cream
+        - 4 tbsp butter
+        - Fresh cilantro
+        """,
+        "instructions": """
+        1. Marinate chicken in yogurt and spices
+        2. Cook chicken until golden
+        3. Prepare sauce with tomatoes and cream
+        4. Combine chicken and sauce
+        5. Garnish with cilantro
+        """,
+        "cooking_time": "1 hour",
+        "nutrition": {
+            "calories": 450,
+            "protein": 35,
+            "carbs": 12,
+            "fat": 28
+        }
+    },
+    {
+        "id": "sushi-roll",
+        "name": "Sushi Roll",
+        "cuisine": "Japanese",
+        "category": "non-vegetarian",
+        "rating": 4.7,
+        "difficulty": "Hard",
+        "ingredients": """
+        - 2 cups sushi rice
+        - 4 sheets nori
+        - 1 avocado
+        - 1 cucumber
+        - 8 oz fresh tuna
+        - Soy sauce
+        - Wasabi
+        - Pickled ginger
+        """,
+        "instructions": """
+        1. Cook sushi rice with vinegar
+        2. Lay nori sheet on bamboo mat
+        3. Spread rice and add fillings
+        4. Roll tightly using the mat
+        5. Slice into pieces
+        """,
+        "cooking_time": "1 hour",
+        "nutrition": {
+            "calories": 320,
+            "protein": 18,
+            "carbs": 45,
+            "fat": 9
+        }
+    },
+    {
+        "id": "chocolate-lava-cake",
+        "name": "Chocolate Lava Cake",
+        "cuisine": "French",
+        "category": "desserts",
+        "rating": 4.9,
+        "difficulty": "Medium",
+        "ingredients": """
+        - 6 oz dark chocolate
+        - 6 oz butter
+        - 3 eggs
+        - 3 egg yolks
+        - 1/2 cup sugar
+        - 1/4 cup flour
+        - Vanilla extract
+        - Powdered sugar
+        """,
+        "instructions": """
+        1. Melt chocolate and butter
+        2. Mix eggs, sugar, and flour
+        3. Combine all ingredients
+        4. Pour into ramekins
+        5. Bake at 400°F for 12 minutes
+        """,
+        "cooking_time": "30 minutes",
+        "nutrition": {
+            "calories": 380,
+            "protein": 6,
+            "carbs": 35,
+            "fat": 24
+        }
+    }
+]
+
+
+# Leading bullet or step number on an ingredient or instruction line
+_ITEM_MARKER = re.compile(r"^(?:[-*\u2022]|\d+[.)])\s*")
+
+def split_items(value):
+    """Split ingredient or instruction text into items without bullets or step numbers"""
+    lines = value if isinstance(value, (list, tuple)) else str(value or "").split("\n")
+    items = (_ITEM_MARKER.sub("", line.strip()) for line in lines)
+    return tuple(item for item in items if item)
+
+class Recipe:
+    """Compact catalog recipe record.
+
+    Ingredients and steps are stored pre-split, repeated strings such as
+    cuisine, category and common ingredient lines are interned, and minutes
+    and nutrition are plain numbers, so filtering, rendering and the
+    shopping list never re-parse recipe text. Records are shared between
+    sessions; use replace() rather than mutating one.
+    """
+    __slots__ = (
+        "id", "name", "cuisine", "category", "rating", "difficulty",
+        "ingredients", "steps", "cooking_time", "minutes",
+        "calories", "protein", "carbs", "fat", "tags",
+    )
+
+    def __init__(self, id, name, cuisine="", category="", rating=None, difficulty="",
+                 ingredients=(), steps=(), cooking_time="", minutes=0,
+                 calories=None, protein=None, carbs=None, fat=None, tags=()):
+        self.id = id
+        self.name = name
+        self.cuisine = sys.intern(cuisine)
+        self.category = sys.intern(category)
+        self.rating = rating
+        self.difficulty = sys.intern(difficulty)
+        # Lines like "1 onion" or "Serve hot" repeat across a catalog; share them
+        self.ingredients = tuple(sys.intern(item) for item in ingredients)
+        self.steps = tuple(sys.intern(step) for step in steps)
+        self.cooking_time = sys.intern(cooking_time)
+        self.minutes = minutes
+        self.calories = calories
+        self.protein = protein
+        self.carbs = carbs
+        self.fat = fat
+        self.tags = tuple(sys.intern(tag) for tag in tags)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a raw recipe dict such as the catalog data"""
+        nutrition = data.get('nutrition') or {}
+        cooking_time = str(data.get('cooking_time', ''))
+        return cls(
+            id=recipe_id(data),
+            name=data.get('name', ''),
+            cuisine=data.get('cuisine', ''),
+            category=data.get('category', ''),
+            rating=data.get('rating'),
+            difficulty=data.get('difficulty') or '',
+            ingredients=split_items(data.get('ingredients')),
+            steps=split_items(data.get('instructions')),
+            cooking_time=cooking_time,
+            minutes=data.get('minutes') or cooking_minutes(cooking_time),
+            calories=nutrition.get('calories'),
+            protein=nutrition.get('protein'),
+            carbs=nutrition.get('carbs'),
+            fat=nutrition.get('fat'),
+            tags=data.get('tags') or (),
+        )
+
+    @property
+    def nutrition(self):
+        """Per-serving nutrition as a dict, or None while it is unknown"""
+        if self.calories is None:
+            return None
+        return {"calories": self.calories, "protein": self.protein, "carbs": self.carbs, "fat": self.fat}
+
+    def replace(self, **changes):
+        """Return a copy of the record with the given fields changed"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return Recipe(**fields)
+
+    def to_dict(self):
+        """Convert back to the raw dict shape, e.g. for JSON storage"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "cuisine": self.cuisine,
+            "category": self.category,
+            "rating": self.rating,
+            "difficulty": self.difficulty,
+            "ingredients": "\n".join(f"- {item}" for item in self.ingredients),
+            "instructions": "\n".join(f"{i + 1}. {step}" for i, step in enumerate(self.steps)),
+            "cooking_time": self.cooking_time,
+            "nutrition": self.nutrition,
+            "tags": list(self.tags),
+        }
+
+    def __repr__(self):
+        return f"Recipe(id={self.id!r}, name={self.name!r})"
+
+@functools.lru_cache(maxsize=1)
+def catalog_version():
+    """Hash of the catalog contents, used to invalidate data derived from it"""
+    digest = hashlib.sha1()
+    for recipe in _CATALOG_DATA:
+        digest.update(json.dumps(recipe, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def recipe_id(recipe):
+    """Return a recipe's stable id, deriving a slug from its name if it has none"""
+    if isinstance(recipe, Recipe):
+        return recipe.id
+    return recipe.get('id') or re.sub(r"[^a-z0-9]+", "-", recipe.get('name', '').lower()).strip("-")
+
+@functools.lru_cache(maxsize=1)
+def _recipes_by_id(version):
+    """Id index over the catalog, rebuilt when the catalog version changes"""
+    return {recipe.id: recipe for recipe in FAMOUS_RECIPES}
+
+def get_recipe(rid):
+    """Look up a catalog recipe by id, or None if it no longer exists"""
+    return _recipes_by_id(catalog_version()).get(rid)
+
+def get_recipes_by_ids(ids):
+    """Fetch several recipes by id in one pass, skipping ids not in the catalog"""
+    index = _recipes_by_id(catalog_version())
+    return [index[rid] for rid in ids if rid in index]
+
+def cooking_minutes(cooking_time):
+    """Convert a cooking time like '2 hours 30 minutes' into minutes"""
+    minutes = 0
+    for amount, unit in re.findall(r"(\d+)\s*(hour|hr|min)", str(cooking_time).lower()):
+        minutes += int(amount) * (60 if unit in ("hour", "hr") else 1)
+    return minutes
+
+# The catalog as compact records
+FAMOUS_RECIPES = [Recipe.from_dict(data) for data in _CATALOG_DATA]
+
+def matches_time_filter(recipe, time_filter):
+    """Check whether a recipe falls into the selected cooking time bucket"""
+    minutes = recipe.minutes
+    if time_filter == "Quick (< 30 mins)":
+        return minutes <= 30
+    if time_filter == "Medium (30-60 mins)":
+        return 30 < minutes <= 60
+    return minutes > 60
+
+def matches_category(recipe, category):
+    """Check whether a recipe belongs to one of the home screen categories"""
+    if category == "quick-meals":
+        return recipe.minutes <= 30
+    return recipe.category == category
+
+def recipe_matches(recipe, query, cuisine_filter, time_filter, category):
+    """Check one recipe against a lowercased search query and the filters"""
+    if query and query not in recipe.name.lower():
+        return False
+    if cuisine_filter != "All" and recipe.cuisine != cuisine_filter:
+        return False
+    if time_filter != "All" and not matches_time_filter(recipe, time_filter):
+        return False
+    if category and not matches_category(recipe, category):
+        return False
+    return True
+
+def filter_recipes(recipes, search_query="", cuisine_filter="All", time_filter="All", category=None):
+    """Yield the recipes matching the search query and filters"""
+    query = search_query.lower()
+    for recipe in recipes:
+        if recipe_matches(recipe, query, cuisine_filter, time_filter, category):
+            yield recipe
+
+@st.cache_resource(show_spinner=False)
+def ensure_recipe_index(version):
+    """Write the memory-mapped search index for this catalog version, once"""
+    path = os.path.join("data", f"recipe_index_{version}.bin")
+    if not os.path.exists(path):
+        ensure_data_directory()
+        build_recipe_index(FAMOUS_RECIPES, path, version)
+    return path
+
+@st.cache_resource(show_spinner=False)
+def get_search_pool(version):
+    """Process pool whose workers each map the catalog index read-only"""
+    return ProcessPoolExecutor(
+        max_workers=SEARCH_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_search_worker,
+        initargs=(ensure_recipe_index(version),)
+    )
+
+@memoize("filter", max_entries=256)
+def get_filtered_indices(search_query, cuisine_filter, time_filter, category, version):
+    """Catalog positions of the recipes matching the filters.
+
+    ``version`` is the catalog version, so results are recomputed whenever
+    the catalog changes and reused across reruns otherwise. Large catalogs
+    are scanned in slices by the search process pool, which keeps CPU-bound
+    filtering off the Streamlit process.
+    """
+    if len(FAMOUS_RECIPES) >= PARALLEL_SEARCH_THRESHOLD:
+        pool = get_search_pool(version)
+        step = -(-len(FAMOUS_RECIPES) // SEARCH_WORKERS)
+        futures = [
+            pool.submit(search_in_worker, search_query, cuisine_filter, time_filter, category, start, start + step)
+            for start in range(0, len(FAMOUS_RECIPES), step)
+        ]
+        return tuple(i for future in futures for i in future.result())
+    query = search_query.lower()
+    return tuple(
+        i for i, recipe in enumerate(FAMOUS_RECIPES)
+        if recipe_matches(recipe, query, cuisine_filter, time_filter, category)
+    )
+
+def get_recipe_page(search_query, cuisine_filter, time_filter, category, page, version, page_size=RECIPES_PER_PAGE):
+    """Return one page of filtered recipes together with the total match count.
+
+    Only the memoized match positions are cached; the page holds the shared
+    catalog records themselves, so a rerun neither copies nor unpickles
+    recipes and never materializes more than ``page_size`` of them.
+    """
+    indices = get_filtered_indices(search_query, cuisine_filter, time_filter, category, version)
+    start = page * page_size
+    return [FAMOUS_RECIPES[i] for i in indices[start:start + page_size]], len(indices)
+
+@functools.lru_cache(maxsize=8)
+def get_top_rated(k, version):
+    """Highest-rated catalog recipes, computed once per catalog version"""
+    return sorted(FAMOUS_RECIPES, key=lambda recipe: recipe.rating or 0, reverse=True)[:k]
@@ -0,0 +1,209 @@
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import shared_store
+from ingredients import edit_distance
+
+# Minimum cosine similarity for two questions to share an answer
+SIMILARITY_THRESHOLD = 0.88
+
+# Cached answers expire after this many seconds
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Least recently used answers are evicted beyond this many entries
+CACHE_MAX_ENTRIES = 500
+
+# Shared cache namespace through which app processes exchange answers
+SHARED_NAMESPACE = "chat_answers"
+
+# Seconds between pulls of answers cached by other processes
+SYNC_INTERVAL_SECONDS = 5
+
+# Phrasings that mean the same thing, rewritten before embedding
+_PHRASE_SYNONYMS = [
+    (r"\bwhat can i use instead of\b", "substitute for"),
+    (r"\bwhat can i use in place of\b", "substitute for"),
+    (r"\bwhat (?:can|could|should) i (?:replace|swap)\b", "substitute for"),
+    (r"\b(?:replacement|alternative|swap|substitution)s?\b", "substitute"),
+    (r"\binstead of\b", "substitute for"),
+    (r"\bin place of\b", "substitute for"),
+    (r"\bhow (?:do|can|should) (?:i|you)\b", "how to"),
+    (r"\bwhat(?:'s| is) the best way to\b", "how to"),
+]
+
+# Words that carry no meaning for matching
+_STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "you", "your", "we", "is", "are", "be",
+    "can", "could", "would", "should", "do", "does", "please", "some", "any",
+    "what", "which", "use", "to", "of", "in", "on", "it", "for", "with", "and",
+}
+
+# Words that flip a question's meaning, so they must match exactly, never by spelling
+_MODIFIERS = {
+    "no", "not", "without", "free", "raw", "vegan", "vegetarian", "gluten", "dairy",
+    "frozen", "dried", "fresh", "less", "more", "low", "high",
+}
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"lookups": 0, "hits": 0, "saved_seconds": 0.0}
+_sync = {"last_pull": 0.0, "last_updated": 0.0}
+
+def normalize_question(question):
+    """Lowercase a question, unify common phrasings and drop punctuation"""
+    text = question.lower().strip()
+    for pattern, replacement in _PHRASE_SYNONYMS:
+        text = re.sub(pattern, replacement, text)
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    return " ".join(text.split())
+
+def content_words(question):
+    """Stemmed words of a question that carry meaning"""
+    words = []
+    for word in normalize_question(question).split():
+        if word in _STOPWORDS:
+            continue
+        # Crude stemming so "tomatoes" and "tomato" share features
+        word = word[:-2] if word.endswith("es") and len(word) > 4 else word
+        word = word[:-1] if word.endswith("s") and len(word) > 3 else word
+        words.append(word)
+    return words
+
+def _has_counterpart(word, others):
+    """Whether a word appears in others, allowing one typo in longer plain words"""
+    if word in others:
+        return True
+    if len(word) < 5 or word in _MODIFIERS or word.isdigit():
+        return False
+    return any(len(other) >= 5 and edit_distance(word, other) <= 1 for other in others)
+
+def same_content(a, b):
+    """Whether two questions' content words pair up, so they can only differ in phrasing or spelling.
+
+    Cosine similarity alone scores "pizza dough without yeast" close to
+    "pizza dough with yeast"; this rejects any extra or changed word,
+    number or modifier.
+    """
+    a, b = set(a), set(b)
+    return all(_has_counterpart(word, b) for word in a) and all(_has_counterpart(word, a) for word in b)
+
+def embed_question(question):
+    """Embed a question as a sparse, L2-normalized bag of words and character trigrams"""
+    vector = {}
+    for word in content_words(question):
+        vector[word] = vector.get(word, 0.0) + 1.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            trigram = "3:" + padded[i:i + 3]
+            vector[trigram] = vector.get(trigram, 0.0) + 0.25
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if norm:
+        vector = {k: v / norm for k, v in vector.items()}
+    return vector
+
+def cosine_similarity(a, b):
+    """Cosine similarity of two normalized sparse vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+def _evict_expired(now):
+    """Drop expired entries; caller must hold the lock"""
+    expired = [key for key, entry in _cache.items() if now - entry["created"] > CACHE_TTL_SECONDS]
+    for key in expired:
+        del _cache[key]
+
+def _insert(key, question, answer, latency, created):
+    """Add an entry and enforce the LRU bound; caller must hold the lock"""
+    _cache[key] = {
+        "question": question,
+        "vector": embed_question(question),
+        "words": content_words(question),
+        "answer": answer,
+        "latency": latency,
+        "created": created,
+        "hits": 0,
+    }
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+def _pull_shared(now):
+    """Merge answers cached by other app processes since the last pull"""
+    if now - _sync["last_pull"] < SYNC_INTERVAL_SECONDS:
+        return
+    _sync["last_pull"] = now
+    try:
+        rows = shared_store.items_since(SHARED_NAMESPACE, _sync["last_updated"])
+    except Exception as e:
+        print(f"Error reading shared answer cache: {e}")
+        return
+    with _lock:
+        for key, entry, updated_at in rows:
+            _sync["last_updated"] = max(_sync["last_updated"], updated_at)
+            if key not in _cache:
+                _insert(key, entry["question"], entry["answer"], entry["latency"], entry["created"])
+
+def warm_cache():
+    """Pull answers cached by other processes ahead of the first lookup"""
+    _sync["last_pull"] = 0.0
+    _pull_shared(time.time())
+
+def lookup_answer(question):
+    """Return a cached answer for a similar question, or None"""
+    vector = embed_question(question)
+    words = content_words(question)
+    now = time.time()
+    _pull_shared(now)
+    with _lock:
+        _stats["lookups"] += 1
+        _evict_expired(now)
+        best_key, best_score = None, 0.0
+        for key, entry in _cache.items():
+            score = cosine_similarity(vector, entry["vector"])
+            if score > best_score and score >= SIMILARITY_THRESHOLD and same_content(words, entry["words"]):
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        entry = _cache[best_key]
+        _cache.move_to_end(best_key)
+        entry["hits"] += 1
+        _stats["hits"] += 1
+        _stats["saved_seconds"] += entry["latency"]
+        return entry["answer"]
+
+def store_answer(question, answer, latency):
+    """Cache an answer along with how long it took to generate"""
+    key = normalize_question(question)
+    created = time.time()
+    with _lock:
+        _insert(key, question, answer, latency, created)
+    try:
+        shared_store.put(
+            SHARED_NAMESPACE, key,
+            {"question": question, "answer": answer, "latency": latency, "created": created},
+            ttl=CACHE_TTL_SECONDS
+        )
+    except Exception as e:
+        print(f"Error writing shared answer cache: {e}")
+
+def clear_cache():
+    """Remove every cached answer"""
+    with _lock:
+        _cache.clear()
+
+def get_cache_stats():
+    """Return hit rate, saved latency and per-entry hit counts"""
+    with _lock:
+        lookups = _stats["lookups"]
+        return {
+            "entries": len(_cache),
+            "lookups": lookups,
+            "hits": _stats["hits"],
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+            "saved_seconds": _stats["saved_seconds"],
+            "entry_hits": {entry["question"]: entry["hits"] for entry in _cache.values()},
+        }
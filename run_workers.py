@@ -0,0 +1,46 @@
+"""Run several Streamlit app workers behind a sticky load balancer.
+
+    python run_workers.py --workers 4 --base-port 8501
+
+Each worker is a separate process listening on base-port + i. All workers
+share the memory-mapped recipe index and the SQLite caches under data/;
+see "Multi-Process Deployment" in the README for the load balancer setup.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+
+def main():
+    parser = argparse.ArgumentParser(description="Run multiple app workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--base-port", type=int, default=8501)
+    parser.add_argument("--address", default="127.0.0.1")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # Split the cores between the workers' search pools
+    env.setdefault("RECIPE_SEARCH_WORKERS", str(max(1, (os.cpu_count() or 1) // args.workers)))
+    processes = []
+    for i in range(args.workers):
+        port = args.base_port + i
+        processes.append(subprocess.Popen([
+            sys.executable, "-m", "streamlit", "run", "app.py",
+            "--server.port", str(port),
+            "--server.address", args.address,
+            "--server.headless", "true",
+        ], env=env))
+        print(f"Worker {i} on http://{args.address}:{port}")
+
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.send_signal(signal.SIGTERM)
+        for process in processes:
+            process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils import ensure_data_directory
+
+# Key-value cache shared by every app process on this machine
+SHARED_CACHE_DB = os.path.join("data", "shared_cache.db")
+
+_local = threading.local()
+
+def connect(path):
+    """Open a SQLite connection in WAL mode, so readers never block the writer"""
+    ensure_data_directory()
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+def _connection():
+    """Per-thread connection to the shared cache, created on first use"""
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = connect(SHARED_CACHE_DB)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, expires_at REAL, PRIMARY KEY (namespace, key))"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_cache_updated ON cache (namespace, updated_at)")
+        _local.connection = connection
+    return connection
+
+def get(namespace, key, default=None):
+    """Return a cached JSON value, or default if missing or expired"""
+    row = _connection().execute(
+        "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+    ).fetchone()
+    if row is None or (row[1] is not None and row[1] < time.time()):
+        return default
+    return json.loads(row[0])
+
+def get_many(namespace, keys):
+    """Return a dict of the unexpired values stored for the given keys"""
+    keys = list(keys)
+    found = {}
+    now = time.time()
+    # Stay well below SQLite's bound-parameter limit
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        for key, value, expires_at in _connection().execute(
+            f"SELECT key, value, expires_at FROM cache WHERE namespace = ? AND key IN ({placeholders})",
+            [namespace] + chunk
+        ):
+            if expires_at is None or expires_at >= now:
+                found[key] = json.loads(value)
+    return found
+
+def put(namespace, key, value, ttl=None):
+    """Store a JSON-serializable value, optionally expiring after ttl seconds"""
+    put_many(namespace, {key: value}, ttl)
+
+def put_many(namespace, values, ttl=None, older_than=None):
+    """Store several values in a single transaction.
+
+    With ``older_than``, keys written by anyone after that time are left
+    alone, so a slow batch job cannot overwrite fresher values.
+    """
+    now = time.time()
+    expires_at = now + ttl if ttl else None
+    connection = _connection()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.executemany(
+            "INSERT INTO cache (namespace, key, value, updated_at, expires_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, "
+            "updated_at = excluded.updated_at, expires_at = excluded.expires_at "
+            "WHERE ? IS NULL OR cache.updated_at < ?",
+            [(namespace, key, json.dumps(value), now, expires_at, older_than, older_than) for key, value in values.items()]
+        )
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+
+def items_since(namespace, since):
+    """Return (key, value, updated_at) for entries written after ``since``"""
+    now = time.time()
+    return [
+        (key, json.loads(value), updated_at)
+        for key, value, updated_at, expires_at in _connection().execute(
+            "SELECT key, value, updated_at, expires_at FROM cache "
+            "WHERE namespace = ? AND updated_at > ? ORDER BY updated_at",
+            (namespace, since)
+        )
+        if expires_at is None or expires_at >= now
+    ]
+
+def delete(namespace, key):
+    """Remove a cached value"""
+    _connection().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+def delete_many(namespace, keys, older_than=None):
+    """Remove several values, optionally only those last written before ``older_than``"""
+    connection = _connection()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.executemany(
+            "DELETE FROM cache WHERE namespace = ? AND key = ? AND (? IS NULL OR updated_at < ?)",
+            [(namespace, key, older_than, older_than) for key in keys]
+        )
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+
+def purge_expired():
+    """Drop expired entries from every namespace"""
+    _connection().execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
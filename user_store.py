@@ -0,0 +1,147 @@
+"""Per-user favorites, meal plans, shopping lists and chat logs, persisted in SQLite.
+
+Profiles and passwords stay in user_data.csv; everything a user collects
+while using the app lives here so it survives logouts and restarts.
+"""
+import os
+import threading
+import time
+
+from shared_store import connect
+
+# Favorites, meal plans and shopping lists of every user
+USER_STORE_DB = os.path.join("data", "user_store.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS favorites (
+    username TEXT NOT NULL, recipe_id TEXT NOT NULL, added_at REAL NOT NULL,
+    PRIMARY KEY (username, recipe_id)
+);
+CREATE TABLE IF NOT EXISTS meal_plans (
+    id INTEGER PRIMARY KEY, username TEXT NOT NULL, date TEXT NOT NULL, meal TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS meal_plans_by_user ON meal_plans (username, date);
+CREATE TABLE IF NOT EXISTS shopping_lists (
+    id INTEGER PRIMARY KEY, username TEXT NOT NULL, item TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS shopping_lists_by_user ON shopping_lists (username);
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY, username TEXT NOT NULL, role TEXT NOT NULL,
+    content TEXT NOT NULL, created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chat_messages_by_user ON chat_messages (username, id);
+"""
+
+_local = threading.local()
+
+def get_connection():
+    """Per-thread connection to the user store, created on first use"""
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = connect(USER_STORE_DB)
+        connection.executescript(SCHEMA)
+        _local.connection = connection
+    return connection
+
+def load_user_state(username):
+    """Return a user's favorites (recipe id -> time added), meal plan rows and shopping list.
+
+    Shopping list rows carry their id, since the same item can be listed twice.
+    """
+    connection = get_connection()
+    favorites = dict(connection.execute(
+        "SELECT recipe_id, added_at FROM favorites WHERE username = ?", (username,)
+    ))
+    meals = [
+        {'date': date, 'meal': meal}
+        for date, meal in connection.execute(
+            "SELECT date, meal FROM meal_plans WHERE username = ? ORDER BY id", (username,)
+        )
+    ]
+    items = [
+        {'id': item_id, 'item': item}
+        for item_id, item in connection.execute(
+            "SELECT id, item FROM shopping_lists WHERE username = ? ORDER BY id", (username,)
+        )
+    ]
+    return favorites, meals, items
+
+def add_favorite(username, recipe_id, added_at=None):
+    """Save a favorite recipe"""
+    get_connection().execute(
+        "INSERT INTO favorites (username, recipe_id, added_at) VALUES (?, ?, ?) "
+        "ON CONFLICT (username, recipe_id) DO UPDATE SET added_at = excluded.added_at",
+        (username, recipe_id, added_at or time.time())
+    )
+
+def remove_favorite(username, recipe_id):
+    """Remove a favorite recipe"""
+    get_connection().execute(
+        "DELETE FROM favorites WHERE username = ? AND recipe_id = ?", (username, recipe_id)
+    )
+
+def add_meals(username, meals):
+    """Append (date, meal) pairs to a user's meal plan"""
+    get_connection().executemany(
+        "INSERT INTO meal_plans (username, date, meal) VALUES (?, ?, ?)",
+        [(username, date, meal) for date, meal in meals]
+    )
+
+def add_shopping_items(username, items):
+    """Append items to a user's shopping list; return them as rows with their ids"""
+    connection = get_connection()
+    stored = []
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        for item in items:
+            cursor = connection.execute(
+                "INSERT INTO shopping_lists (username, item) VALUES (?, ?)", (username, item)
+            )
+            stored.append({'id': cursor.lastrowid, 'item': item})
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    return stored
+
+def remove_shopping_item(username, item_id):
+    """Remove one row from a user's shopping list"""
+    get_connection().execute(
+        "DELETE FROM shopping_lists WHERE id = ? AND username = ?", (item_id, username)
+    )
+
+def append_chat_messages(username, messages):
+    """Append messages to a user's chat log; return them with their log ids.
+
+    The log is append-only: messages are never edited or deleted, so any
+    page of it can be cached once loaded.
+    """
+    connection = get_connection()
+    stored = []
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        for message in messages:
+            cursor = connection.execute(
+                "INSERT INTO chat_messages (username, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (username, message["role"], message["content"], time.time())
+            )
+            stored.append({"id": cursor.lastrowid, "role": message["role"], "content": message["content"]})
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    return stored
+
+def load_chat_messages(username, limit, before_id=None):
+    """Return up to ``limit`` of a user's latest messages before ``before_id``, oldest first.
+
+    Also returns whether even older messages exist.
+    """
+    query = "SELECT id, role, content FROM chat_messages WHERE username = ?"
+    params = [username]
+    if before_id is not None:
+        query += " AND id < ?"
+        params.append(before_id)
+    rows = get_connection().execute(query + " ORDER BY id DESC LIMIT ?", params + [limit + 1]).fetchall()
+    messages = [{"id": rid, "role": role, "content": content} for rid, role, content in reversed(rows[:limit])]
+    return messages, len(rows) > limit
@@ -1,4 +1,5 @@
 import pandas as pd
+import functools
 import os
 
 def ensure_data_directory():
@@ -37,21 +38,36 @@ def validate_user_input(input_data):
     
     return True, "Input validation successful"
 
+@functools.lru_cache(maxsize=256)
 def format_recipe_display(recipe):
-    """Format recipe data for display"""
-    return {
-        'name': recipe.get('name', ''),
-        'ingredients': recipe.get('ingredients', ''),
-        'instructions': recipe.get('instructions', ''),
-        'cooking_time': recipe.get('cooking_time', '')
-    }
+    """Format a recipe record's ingredients, steps and cooking time as markdown.
+
+    Records are shared and never mutated, so the text is built once per record.
+    """
+    ingredients = "\n".join(f"- {item}" for item in recipe.ingredients)
+    steps = "\n".join(f"{i}. {step}" for i, step in enumerate(recipe.steps, 1))
+    return (
+        f"**Ingredients:**\n\n{ingredients}\n\n"
+        f"**Instructions:**\n\n{steps}\n\n"
+        f"**Cooking Time:** {recipe.cooking_time}"
+    )
+
+def format_chat_transcript(messages):
+    """Format a page of chat messages as one markdown block"""
+    return "\n\n".join(
+        f"**{'You' if message['role'] == 'user' else 'Assistant'}:** {message['content']}"
+        for message in messages
+    )
+
+# Columns of user_data.csv
+USER_COLUMNS = [
+    'username', 'password', 'favorite_cuisine', 'dietary_restrictions',
+    'preferred_ingredients', 'ingredients_to_avoid', 'cooking_skill',
+    'favorite_meal', 'spice_level', 'cooking_time_preference'
+]
 
 def initialize_user_data_file():
     """Initialize the user_data.csv file if it does not exist"""
     if not os.path.exists("user_data.csv"):
-        df = pd.DataFrame(columns=[
-            'username', 'password', 'favorite_cuisine', 'dietary_restrictions',
-            'preferred_ingredients', 'ingredients_to_avoid', 'cooking_skill',
-            'favorite_meal', 'spice_level', 'cooking_time_preference'
-        ])
+        df = pd.DataFrame(columns=USER_COLUMNS)
         df.to_csv("user_data.csv", index=False)
\ No newline at end of file